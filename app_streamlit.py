@@ -8,11 +8,13 @@ from sku_dupe_finder.core import analyze, write_report
 st.set_page_config(page_title="SKU Cross-Workbook Duplicates", layout="centered")
 
 st.title("SKU Cross-Workbook Duplicates")
-st.write("Upload multiple **.xlsx** files and find SKUs that appear in more than one workbook.")
+st.write("Upload multiple **.xlsx**, .xlsm or .csv files and find SKUs that appear in more than one workbook.")
 
-uploads = st.file_uploader("Upload Excel files", type=["xlsx"], accept_multiple_files=True)
+uploads = st.file_uploader("Upload Excel files", type=["xlsx", "xlsm", "xlsb", "ods", "csv"], accept_multiple_files=True)
 explicit_cols = st.text_input("Explicit SKU column names (comma-separated, optional)", value="")
 patterns_text = st.text_input("Custom regex patterns for SKU columns (comma-separated, optional)", value="")
+sheets_text = st.text_input("Only scan sheets matching (comma-separated globs, 're:' for regex, optional)", value="")
+exclude_sheets_text = st.text_input("Skip sheets matching (comma-separated, e.g. Pivot*, Notes; optional)", value="")
 include_within = st.checkbox("Include duplicates within the same workbook (default OFF)", value=False)
 
 run = st.button("Run analysis")
@@ -30,7 +32,7 @@ if run:
         tmp_paths = []
         import tempfile, os
         for up in uploads:
-            suffix = ".xlsx"
+            suffix = os.path.splitext(up.name)[1].lower() or ".xlsx"  # the reader is picked by extension
             fd, tmp = tempfile.mkstemp(suffix=suffix)
             os.close(fd)
             with open(tmp, "wb") as f:
@@ -43,6 +45,8 @@ if run:
             sku_cols=[c.strip() for c in explicit_cols.split(",") if c.strip()] or None,
             patterns=[p.strip() for p in patterns_text.split(",") if p.strip()] or None,
             include_within_workbook_dupes=include_within,
+            sheet_include=[p.strip() for p in sheets_text.split(",") if p.strip()] or None,
+            sheet_exclude=[p.strip() for p in exclude_sheets_text.split(",") if p.strip()] or None,
         )
 
         # Prepare report to download
@@ -0,0 +1 @@
+"""Performance benchmarks for sku_dupe_finder (run from the repo root: python -m benchmarks.run)."""
@@ -0,0 +1,101 @@
+from __future__ import annotations
+import argparse
+import os
+import random
+from typing import List
+
+import xlsxwriter
+
+_EXTRA_HEADERS = ["Description", "Qty", "Unit Cost", "Location", "Supplier", "Notes", "Category", "Updated"]
+_NULL_VALUES = ["N/A", "n/a", "NULL", "none", "-", ""]
+
+def _messy(sku: str, rng: random.Random):
+    """Return ``sku`` written the way real exports mangle it (same value after normalization)."""
+    kind = rng.randrange(5)
+    if kind == 0 and sku.isdigit():
+        return float(sku)                      # numeric cell: 123.0
+    if kind == 1:
+        return f"  {sku.lower()}  "            # padding + lower case
+    if kind == 2:
+        return f'"{sku}"'                      # quoted
+    if kind == 3:
+        return f"{sku}.0" if sku.isdigit() else f"'{sku}'"  # float-as-text / single-quoted
+    return f"\t{sku}\n"
+
+def _sku(n: int) -> str:
+    # mix of plain numeric SKUs (stored as numbers by spreadsheet users) and coded ones
+    return str(100000 + n) if n % 3 == 0 else f"SKU-{n:07d}"
+
+def generate_corpus(out_dir: str, files: int = 4, sheets: int = 2, rows: int = 5000,
+                    sku_columns: int = 1, extra_columns: int = 6, duplicate_rate: float = 0.2,
+                    messy_rate: float = 0.1, null_rate: float = 0.02, seed: int = 0) -> List[str]:
+    """Write a deterministic synthetic corpus of workbooks and return their paths.
+
+    Each sheet has ``rows`` data rows with ``sku_columns`` SKU columns and
+    ``extra_columns`` filler columns. A ``duplicate_rate`` share of SKU cells is
+    drawn from a pool shared by all workbooks (the cross-workbook duplicates);
+    the rest are unique. ``messy_rate`` of SKU cells are written as floats,
+    padded, quoted or lower-cased variants and ``null_rate`` as N/A-style blanks.
+    The same arguments always produce the same cell values.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    rng = random.Random(seed)
+    shared_pool = max(int(files * sheets * rows * sku_columns * duplicate_rate / 3), 1)
+    next_unique = shared_pool
+    sku_headers = ["SKU", "Item Code", "Part No", "Product Code"]
+    paths = []
+    for fi in range(files):
+        path = os.path.join(out_dir, f"bench_{fi:03d}.xlsx")
+        wb = xlsxwriter.Workbook(path, {"constant_memory": True})
+        for si in range(sheets):
+            ws = wb.add_worksheet(f"Sheet{si + 1}")
+            headers = [sku_headers[c % len(sku_headers)] + ("" if c < len(sku_headers) else f" {c}")
+                       for c in range(sku_columns)]
+            headers += [_EXTRA_HEADERS[c % len(_EXTRA_HEADERS)] + ("" if c < len(_EXTRA_HEADERS) else f" {c}")
+                        for c in range(extra_columns)]
+            ws.write_row(0, 0, headers)
+            for r in range(1, rows + 1):
+                row = []
+                for _ in range(sku_columns):
+                    if rng.random() < null_rate:
+                        row.append(rng.choice(_NULL_VALUES))
+                        continue
+                    if rng.random() < duplicate_rate:
+                        sku = _sku(rng.randrange(shared_pool))
+                    else:
+                        sku = _sku(next_unique)
+                        next_unique += 1
+                    row.append(_messy(sku, rng) if rng.random() < messy_rate else
+                               (float(sku) if sku.isdigit() else sku))
+                for c in range(extra_columns):
+                    row.append(round(rng.random() * 1000, 2) if c % 2 else f"item {rng.randrange(10 ** 6)}")
+                ws.write_row(r, 0, row)
+        wb.close()
+        paths.append(path)
+    return paths
+
+def count_rows(files: int, sheets: int, rows: int, **_) -> int:
+    """Data rows in a corpus generated with these parameters."""
+    return files * sheets * rows
+
+def build_parser():
+    p = argparse.ArgumentParser(description="Generate a synthetic workbook corpus for benchmarks.")
+    p.add_argument("out_dir")
+    p.add_argument("--files", type=int, default=4)
+    p.add_argument("--sheets", type=int, default=2)
+    p.add_argument("--rows", type=int, default=5000)
+    p.add_argument("--sku-columns", type=int, default=1)
+    p.add_argument("--extra-columns", type=int, default=6)
+    p.add_argument("--duplicate-rate", type=float, default=0.2)
+    p.add_argument("--messy-rate", type=float, default=0.1)
+    p.add_argument("--null-rate", type=float, default=0.02)
+    p.add_argument("--seed", type=int, default=0)
+    return p
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    paths = generate_corpus(**vars(args))
+    print(f"Wrote {len(paths)} workbooks to {args.out_dir}")
+
+if __name__ == "__main__":
+    main()
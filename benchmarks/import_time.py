@@ -0,0 +1,66 @@
+from __future__ import annotations
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+# Modules the CLI must not load before analysis actually starts.
+HEAVY_MODULES = ("pandas", "numpy", "openpyxl", "xlsxwriter")
+
+def _imported_modules(importtime_log: str) -> List[str]:
+    """Module names from ``python -X importtime`` stderr output."""
+    names = []
+    for line in importtime_log.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            name = line.rsplit("|", 1)[1].strip()
+            if name != "imported package":
+                names.append(name)
+    return names
+
+def measure_cli(args: List[str], repeat: int = 5) -> Dict:
+    """Run ``python -m sku_dupe_finder <args>`` and report startup time and heavy imports."""
+    cmd = [sys.executable, "-X", "importtime", "-m", "sku_dupe_finder", *args]
+    walls = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        proc = subprocess.run(cmd, capture_output=True, text=True)
+        walls.append(time.perf_counter() - t0)
+    modules = _imported_modules(proc.stderr)
+    heavy = sorted({m.split(".")[0] for m in modules} & set(HEAVY_MODULES))
+    return {
+        "args": args,
+        "wall_s": round(min(walls), 4),
+        "modules": len(modules),
+        "heavy_imports": heavy,
+        "returncode": proc.returncode,
+    }
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Check that CLI startup does not import pandas and friends.")
+    p.add_argument("--repeat", type=int, default=5, help="Runs per command; the fastest is reported.")
+    p.add_argument("--out", default=None, help="Write results JSON here.")
+    args = p.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(prefix="sku-import-") as empty_dir:
+        results = [
+            measure_cli(["--help"], args.repeat),
+            measure_cli(["--inputs", os.path.join(empty_dir, "missing")], args.repeat),  # "No workbooks found" path
+        ]
+    failed = False
+    for r in results:
+        status = "FAIL" if r["heavy_imports"] else "ok"
+        print(f"{status:<5}{' '.join(r['args'])[:40]:<42}{r['wall_s'] * 1000:>8.1f} ms  {r['modules']} modules"
+              + (f"  imports {', '.join(r['heavy_imports'])}" if r["heavy_imports"] else ""))
+        failed = failed or bool(r["heavy_imports"])
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({"commands": results}, f, indent=2)
+    if failed:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
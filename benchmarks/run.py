@@ -0,0 +1,190 @@
+from __future__ import annotations
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from typing import Callable, Dict, List
+
+from .generate import count_rows, generate_corpus
+
+RESULTS_FORMAT = 1
+
+def _rss_reader() -> Callable[[], int] | None:
+    """Function returning the current RSS in bytes, or None if the platform gives no cheap way."""
+    try:
+        import psutil
+        proc = psutil.Process()
+        return lambda: proc.memory_info().rss
+    except ImportError:
+        pass
+    if os.path.exists("/proc/self/statm"):
+        page = os.sysconf("SC_PAGE_SIZE")
+
+        def read():
+            with open("/proc/self/statm") as f:
+                return int(f.read().split()[1]) * page
+        return read
+    return None
+
+class PeakRSS:
+    """Sample RSS in a background thread while a stage runs; ``peak`` is the high-water mark in bytes."""
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self._read = _rss_reader()
+        self._stop = threading.Event()
+        self.start_rss = self.peak = 0
+
+    def __enter__(self):
+        if self._read is not None:
+            self.start_rss = self.peak = self._read()
+            self._thread = threading.Thread(target=self._sample, daemon=True)
+            self._thread.start()
+        return self
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, self._read())
+
+    def __exit__(self, *exc):
+        if self._read is not None:
+            self._stop.set()
+            self._thread.join()
+            self.peak = max(self.peak, self._read())
+
+def _measure(fn: Callable, rows: int, repeat: int) -> Dict[str, float]:
+    """Run ``fn`` ``repeat`` times and keep the fastest run (peak RSS is the max over runs)."""
+    best, peak_mb, growth_mb, result = None, 0.0, 0.0, None
+    for _ in range(repeat):
+        with PeakRSS() as mem:
+            t0 = time.perf_counter()
+            result = fn()
+            wall = time.perf_counter() - t0
+        best = wall if best is None else min(best, wall)
+        peak_mb = max(peak_mb, mem.peak / 2 ** 20)
+        growth_mb = max(growth_mb, (mem.peak - mem.start_rss) / 2 ** 20)
+    return {
+        "wall_s": round(best, 4),
+        "peak_rss_mb": round(peak_mb, 1),
+        "rss_growth_mb": round(growth_mb, 1),
+        "rows": rows,
+        "rows_per_s": round(rows / best, 1) if best else None,
+    }, result
+
+def _git_commit() -> str | None:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                             cwd=os.path.dirname(os.path.abspath(__file__)), timeout=10)
+        return out.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+def run_benchmarks(corpus: Dict, work_dir: str, repeat: int = 1, engine: str = "pandas",
+                   jobs: int = 1) -> Dict:
+    """Generate the corpus in ``work_dir`` and time each pipeline stage. Returns the results dict."""
+    import pandas as pd
+    from sku_dupe_finder.core import analyze, find_excel_files, find_sku_columns, write_report
+
+    input_dir = os.path.join(work_dir, "inputs")
+    t0 = time.perf_counter()
+    generate_corpus(input_dir, **corpus)
+    generate_s = time.perf_counter() - t0
+    rows = count_rows(**corpus)
+    stages = {}
+
+    stages["find_excel_files"], files = _measure(
+        lambda: find_excel_files([input_dir], recursive=True), len(os.listdir(input_dir)), repeat)
+
+    frames = [df for fp in files for df in pd.read_excel(fp, sheet_name=None, dtype=str).values()]
+    stages["find_sku_columns"], _ = _measure(lambda: [find_sku_columns(df) for df in frames], rows, repeat)
+    del frames
+
+    stages["analyze"], result = _measure(lambda: analyze(files, jobs=jobs, engine=engine), rows, repeat)
+    details_df, presence_counts, presence_bool, read_errors, sku_col_map = result
+    out_path = os.path.join(work_dir, "report.xlsx")
+    stages["write_report"], _ = _measure(
+        lambda: write_report(out_path, details_df, presence_counts, presence_bool, read_errors, sku_col_map),
+        len(details_df), repeat)
+
+    return {
+        "format": RESULTS_FORMAT,
+        "commit": _git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "platform": platform.platform(),
+        "corpus": corpus,
+        "options": {"repeat": repeat, "engine": engine, "jobs": jobs},
+        "generate_s": round(generate_s, 3),
+        "stages": stages,
+    }
+
+def compare(baseline: Dict, current: Dict, tolerance: float = 0.2) -> List[str]:
+    """Stages whose wall time or peak RSS grew more than ``tolerance`` (a fraction) over ``baseline``."""
+    if baseline.get("corpus") != current.get("corpus"):
+        return ["corpus parameters differ; results are not comparable"]
+    regressions = []
+    for name, now in current["stages"].items():
+        before = baseline["stages"].get(name)
+        if not before:
+            continue
+        for metric in ("wall_s", "peak_rss_mb"):
+            if before[metric] and now[metric] > before[metric] * (1 + tolerance):
+                regressions.append(f"{name}: {metric} {before[metric]} -> {now[metric]} "
+                                   f"(+{now[metric] / before[metric] - 1:.0%})")
+    return regressions
+
+def _print_table(results: Dict):
+    print(f"{'stage':<18}{'wall s':>10}{'rows/s':>14}{'peak RSS MB':>14}{'RSS +MB':>10}")
+    for name, s in results["stages"].items():
+        print(f"{name:<18}{s['wall_s']:>10.3f}{s['rows_per_s'] or 0:>14,.0f}{s['peak_rss_mb']:>14.1f}"
+              f"{s['rss_growth_mb']:>10.1f}")
+
+def build_parser():
+    p = argparse.ArgumentParser(description="Benchmark sku_dupe_finder stages on a synthetic corpus.")
+    p.add_argument("--files", type=int, default=4)
+    p.add_argument("--sheets", type=int, default=2)
+    p.add_argument("--rows", type=int, default=5000)
+    p.add_argument("--sku-columns", type=int, default=1)
+    p.add_argument("--extra-columns", type=int, default=6)
+    p.add_argument("--duplicate-rate", type=float, default=0.2)
+    p.add_argument("--messy-rate", type=float, default=0.1)
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--repeat", type=int, default=3, help="Runs per stage; the fastest is reported.")
+    p.add_argument("--engine", default="pandas")
+    p.add_argument("--jobs", type=int, default=1)
+    p.add_argument("--work-dir", default=None, help="Where to write the corpus (default: a temp dir).")
+    p.add_argument("--out", default=None, help="Write results JSON here.")
+    p.add_argument("--compare", default=None, help="Baseline results JSON; exit 1 on regressions.")
+    p.add_argument("--tolerance", type=float, default=0.2,
+                   help="Allowed slowdown/memory growth vs the baseline (fraction, default 0.2).")
+    return p
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    corpus = {k: getattr(args, k) for k in
+              ("files", "sheets", "rows", "sku_columns", "extra_columns", "duplicate_rate", "messy_rate", "seed")}
+    if args.work_dir:
+        results = run_benchmarks(corpus, args.work_dir, args.repeat, args.engine, args.jobs)
+    else:
+        with tempfile.TemporaryDirectory(prefix="sku-bench-") as tmp:
+            results = run_benchmarks(corpus, tmp, args.repeat, args.engine, args.jobs)
+    _print_table(results)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            regressions = compare(json.load(f), results, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+from __future__ import annotations
+import hashlib
+import json
+import os
+import struct
+import zlib
+from typing import Callable, Dict, Iterable, List, Tuple
+import numpy as np
+
+from .core import DEFAULT_SKU_COL_PATTERNS, SheetFilter, SheetScan
+from .discovery import file_digest
+
+# Bump when the entry layout or the scan semantics change; old entries then simply miss.
+CACHE_FORMAT = 1
+_MAGIC = b"SKUDUPE-SCAN\x00"
+_ENTRY_SUFFIX = ".skc"
+_SIGNATURE_SUFFIX = ".sig"
+_INDEX_NAME = "index.json"
+
+def settings_fingerprint(sku_cols: List[str] | None, patterns: Iterable[str] | None,
+                         sheets: SheetFilter | None = None, engine: str | None = None) -> str:
+    """Short hash of everything that changes which sheets and columns are scanned (and, if given, how)."""
+    settings = {
+        "format": CACHE_FORMAT,
+        "sku_cols": sorted(c.strip().lower() for c in sku_cols) if sku_cols else None,
+        "patterns": list(patterns) if patterns else list(DEFAULT_SKU_COL_PATTERNS),
+    }
+    if sheets:
+        settings["sheets"] = {"include": sheets.include, "exclude": sheets.exclude}
+    if engine is not None:
+        settings["engine"] = engine
+    blob = json.dumps(settings, sort_keys=True).encode("utf-8")
+    return hashlib.blake2b(blob, digest_size=8).hexdigest()
+
+def _sheet_headers(scans: List[SheetScan]) -> List[Dict]:
+    return [{"sheet": scan.sheet, "columns": scan.columns,
+             "occurrences": [[col, len(skus)] for col, _, skus in scan.occurrences]} for scan in scans]
+
+def encode_payload(magic: bytes, header: Dict, scans: Iterable[SheetScan]) -> bytes:
+    """JSON header, then a SKU dictionary and int32 code/row arrays for ``scans`` in order, zlib'd.
+
+    ``header`` must describe the scans (see _sheet_headers) so decode_payload can split the arrays.
+    """
+    uniques: Dict[str, int] = {}
+    codes, rows = [], []
+    for scan in scans:
+        for _, col_rows, skus in scan.occurrences:
+            codes.append(np.fromiter((uniques.setdefault(s, len(uniques)) for s in skus),
+                                     dtype=np.int32, count=len(skus)))
+            rows.append(np.asarray(col_rows, dtype=np.int32))
+    header_bytes = json.dumps(header).encode("utf-8")
+    # Normalized SKUs never contain newlines (whitespace is collapsed to single spaces).
+    dictionary = "\n".join(uniques).encode("utf-8")
+    codes_arr = np.concatenate(codes) if codes else np.empty(0, dtype=np.int32)
+    rows_arr = np.concatenate(rows) if rows else np.empty(0, dtype=np.int32)
+    payload = b"".join([
+        struct.pack("<III", len(header_bytes), len(dictionary), len(uniques)),
+        header_bytes, dictionary,
+        codes_arr.astype("<i4").tobytes(), rows_arr.astype("<i4").tobytes(),
+    ])
+    return magic + zlib.compress(payload, 6)
+
+class _ScanArrays:
+    """Decoded SKU dictionary and code/row arrays, handed out sheet by sheet."""
+
+    def __init__(self, skus: np.ndarray, codes: np.ndarray, rows: np.ndarray):
+        self.skus, self.codes, self.rows = skus, codes, rows
+        self._pos = 0
+
+    def take(self, sheet_headers: List[Dict]) -> List[SheetScan]:
+        scans = []
+        for sheet in sheet_headers:
+            occurrences = []
+            for col, n in sheet["occurrences"]:
+                start, self._pos = self._pos, self._pos + n
+                occurrences.append((col, self.rows[start:self._pos].astype(np.int64),
+                                    self.skus[self.codes[start:self._pos]]))
+            scans.append(SheetScan(sheet["sheet"], sheet["columns"], occurrences))
+        return scans
+
+def decode_payload(magic: bytes, data: bytes, total: Callable[[Dict], int]) -> Tuple[Dict, _ScanArrays]:
+    """Inverse of encode_payload(); ``total(header)`` gives the number of encoded occurrences."""
+    if not data.startswith(magic):
+        raise ValueError("not a %s file" % magic.rstrip(b"\x00").decode())
+    payload = zlib.decompress(data[len(magic):])
+    header_len, dict_len, n_skus = struct.unpack_from("<III", payload)
+    pos = struct.calcsize("<III")
+    header = json.loads(payload[pos:pos + header_len].decode("utf-8"))
+    pos += header_len
+    dictionary = payload[pos:pos + dict_len].decode("utf-8").split("\n") if n_skus else []
+    pos += dict_len
+    n = total(header)
+    codes = np.frombuffer(payload, dtype="<i4", count=n, offset=pos)
+    rows = np.frombuffer(payload, dtype="<i4", count=n, offset=pos + 4 * n)
+    return header, _ScanArrays(np.asarray(dictionary, dtype=object), codes, rows)
+
+def _occurrence_count(sheet_headers: List[Dict]) -> int:
+    return sum(n for sheet in sheet_headers for _, n in sheet["occurrences"])
+
+def encode_scans(scans: List[SheetScan]) -> bytes:
+    """Serialize a workbook's sheet scans (one cache entry)."""
+    return encode_payload(_MAGIC, {"sheets": _sheet_headers(scans)}, scans)
+
+def decode_scans(data: bytes) -> List[SheetScan]:
+    """Inverse of encode_scans()."""
+    header, arrays = decode_payload(_MAGIC, data, lambda h: _occurrence_count(h["sheets"]))
+    return arrays.take(header["sheets"])
+
+class ParseCache:
+    """On-disk cache of per-workbook scan results.
+
+    Entries are keyed by the workbook's content hash plus the detection settings.
+    A small index remembers (size, mtime) -> hash per path so unchanged files are
+    not re-hashed. Entries are evicted least-recently-used once their total size
+    exceeds ``max_bytes``.
+    """
+
+    def __init__(self, cache_dir: str, sku_cols: List[str] | None = None,
+                 patterns: Iterable[str] | None = None, max_bytes: int = 1 << 30,
+                 sheets: SheetFilter | None = None, engine: str | None = None):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        # entries from different engines are kept apart, so a cached result never depends on
+        # which engine happened to fill the cache first
+        self.settings = settings_fingerprint(sku_cols, patterns, sheets, engine)
+        os.makedirs(cache_dir, exist_ok=True)
+        self._index_path = os.path.join(cache_dir, _INDEX_NAME)
+        self._index: Dict[str, Tuple[int, int, str]] = {}
+        try:
+            with open(self._index_path, "r", encoding="utf-8") as f:
+                self._index = {k: tuple(v) for k, v in json.load(f).items()}
+        except (OSError, ValueError):
+            pass
+        self.hits = 0    # workbooks served from the cache this run
+        self.misses = 0  # workbooks parsed (and stored); reported by _close_cache()
+
+    def key(self, path: str, scope: str = "") -> str:
+        """Cache key for a workbook; hashes the content only when size or mtime changed.
+
+        ``scope`` keeps identical files apart when their scan depends on more
+        than the content (a CSV's sheet is named after the file).
+        """
+        st = os.stat(path)
+        abspath = os.path.abspath(path)
+        known = self._index.get(abspath)
+        if known and known[0] == st.st_size and known[1] == st.st_mtime_ns:
+            digest = known[2]
+        else:
+            digest = file_digest(path)
+            self._index[abspath] = (st.st_size, st.st_mtime_ns, digest)
+        if scope:
+            return f"{digest}-{self.settings}-{hashlib.sha1(scope.encode('utf-8')).hexdigest()[:12]}"
+        return f"{digest}-{self.settings}"
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key + _ENTRY_SUFFIX)
+
+    def __contains__(self, key: str) -> bool:
+        return os.path.exists(self._entry_path(key))
+
+    def load(self, key: str) -> List[SheetScan] | None:
+        """Cached scans for ``key`` or None (missing or unreadable entry)."""
+        path = self._entry_path(key)
+        try:
+            with open(path, "rb") as f:
+                scans = decode_scans(f.read())
+            os.utime(path)  # mtime doubles as the LRU clock
+        except (OSError, ValueError, zlib.error, struct.error):
+            return None
+        return scans
+
+    def store(self, key: str, scans: List[SheetScan]):
+        path = self._entry_path(key)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(encode_scans(scans))
+        os.replace(tmp, path)
+
+    def _signature_path(self, key: str, params: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}-{params}{_SIGNATURE_SUFFIX}")
+
+    def load_signature(self, key: str, params: str) -> np.ndarray | None:
+        """MinHash signature stored for ``key`` with hash family ``params`` (see minhash.WorkbookSignatures)."""
+        path = self._signature_path(key, params)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)
+        except OSError:
+            return None
+        return np.frombuffer(data, dtype="<u4").astype(np.uint32)
+
+    def store_signature(self, key: str, params: str, signature: np.ndarray):
+        path = self._signature_path(key, params)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(np.asarray(signature, dtype="<u4").tobytes())
+        os.replace(tmp, path)
+
+    def evict(self):
+        """Drop least-recently-used entries (and signatures) until the cache fits in max_bytes."""
+        entries = []
+        for e in os.scandir(self.cache_dir):
+            if e.name.endswith((_ENTRY_SUFFIX, _SIGNATURE_SUFFIX)):
+                st = e.stat()
+                entries.append((st.st_mtime_ns, st.st_size, e.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+
+    def close(self):
+        """Persist the path index and enforce the size limit."""
+        tmp = f"{self._index_path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self._index, f)
+        os.replace(tmp, self._index_path)
+        self.evict()
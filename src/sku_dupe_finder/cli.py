@@ -1,54 +1,423 @@
 from __future__ import annotations
-import argparse, sys, os
-from .core import find_excel_files, analyze, write_report
+import argparse, importlib.util, itertools, struct, sys, os, zlib
+from datetime import datetime
+from .discovery import iter_excel_files
+from .profiling import NULL_PROFILER, Profiler
 
-def build_parser():
-    p = argparse.ArgumentParser(description="Find SKUs that appear in more than one Excel workbook.")
+def _iso_datetime(value: str) -> datetime:
+    """argparse type for --modified-after/--modified-before."""
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid ISO date/time {value!r} (expected e.g. 2024-01-31 or 2024-01-31T18:00)")
+
+def _add_input_args(p: argparse.ArgumentParser):
+    """Options that choose which files, sheets and columns are scanned, and how."""
     p.add_argument("--inputs", nargs="+", required=True,
-                   help="One or more paths to .xlsx files or directories to scan.")
+                   help="One or more workbooks (.xlsx, .xlsm, .xlsb, .ods, .csv) or directories to scan.")
     p.add_argument("--recursive", action="store_true",
                    help="Recurse into subfolders when input is a directory.")
+    p.add_argument("--max-depth", type=int, default=None,
+                   help="With --recursive, descend at most this many folder levels (0 = only the given folders).")
+    p.add_argument("--files", nargs="+", default=None, metavar="GLOB",
+                   help="Only scan workbooks whose name (or, for globs with a '/', path below the input folder) "
+                        "matches one of these globs, e.g. 'Inventory_*'.")
+    p.add_argument("--exclude-files", nargs="+", default=None, metavar="GLOB",
+                   help="Skip workbooks and folders matching any of these globs, e.g. 'archive' '*_old.xlsx'.")
+    p.add_argument("--modified-after", type=_iso_datetime, default=None, metavar="DATE",
+                   help="Only scan workbooks modified on or after this ISO date/time (e.g. 2024-01-31).")
+    p.add_argument("--modified-before", type=_iso_datetime, default=None, metavar="DATE",
+                   help="Only scan workbooks modified before this ISO date/time.")
     p.add_argument("--sku-columns", nargs="*", default=None,
                    help="Explicit column names to treat as SKU columns (case-insensitive, exact match).")
     p.add_argument("--sku-col-patterns", nargs="*", default=None,
                    help="Regex patterns to detect SKU columns (override defaults).")
-    p.add_argument("--out", default="sku_crossworkbook_duplicates.xlsx",
-                   help="Path to write the Excel report.")
+    p.add_argument("--sheets", nargs="+", default=None, metavar="PATTERN",
+                   help="Only scan sheets whose name matches one of these globs (e.g. 'Stock*'); prefix 're:' for a regex.")
+    p.add_argument("--exclude-sheets", nargs="+", default=None, metavar="PATTERN",
+                   help="Skip sheets matching any of these globs or 're:' regexes (e.g. 'Pivot*' 'Notes').")
+    p.add_argument("--jobs", type=int, default=1,
+                   help="Number of worker processes used to parse workbooks (0 = one per CPU).")
+    p.add_argument("--engine", choices=["pandas", "openpyxl", "xml"], default="pandas",
+                   help="Reader for .xlsx/.xlsm (other formats have their own): 'pandas' loads whole sheets, 'openpyxl' streams only the SKU columns, "
+                        "'xml' parses the xlsx XML directly and decodes only the SKU columns (fastest).")
+    p.add_argument("--pipeline", action="store_true",
+                   help="Overlap folder scanning, file reading, parsing and aggregation (bounded memory); "
+                        "parsing starts while folders are still being listed.")
+    p.add_argument("--cache-dir", default=None,
+                   help="Directory for the per-workbook parse cache; unchanged workbooks are not re-parsed.")
+    p.add_argument("--cache-max-mb", type=int, default=1024,
+                   help="Size limit of the parse cache in MB (least recently used entries are evicted).")
+
+def _add_report_args(p: argparse.ArgumentParser, out_default: str | None = "sku_crossworkbook_duplicates.xlsx"):
+    p.add_argument("--out", default=out_default,
+                   help="Path to write the Excel report. Other formats are written next to it as "
+                        "<out without .xlsx>.<table>.<format>.")
+    p.add_argument("--format", nargs="+", choices=["xlsx", "parquet", "arrow", "csv"], default=["xlsx"],
+                   dest="formats", metavar="FORMAT",
+                   help="Output format(s): xlsx (the report), and/or parquet, arrow or csv for the full results "
+                        "as columnar tables (details, presence, skus, detected_columns, read_issues). "
+                        "parquet/arrow need pyarrow.")
     p.add_argument("--include-within-workbook-dupes", action="store_true",
                    help="Also include duplicates within the same workbook (by default we focus on cross-workbook only).")
+    p.add_argument("--workbook-overlap", action="store_true",
+                   help="Add a Workbook_Overlap sheet: shared SKUs and Jaccard similarity for every pair of workbooks "
+                        "(spots duplicated catalogs).")
+    p.add_argument("--similar-workbooks", nargs="?", type=float, const=0.5, default=None, metavar="THRESHOLD",
+                   help="Add a Similar_Workbooks sheet: pairs of workbooks whose estimated Jaccard similarity "
+                        "is at least THRESHOLD (default 0.5), found from per-workbook MinHash signatures. "
+                        "Approximate, but scales to many workbooks and works with --two-pass; "
+                        "with --cache-dir signatures are reused for unchanged workbooks.")
+    p.add_argument("--stream-report", action="store_true",
+                   help="Write the report in constant memory, splitting Details into Details_2, ... past Excel's row limit.")
+    p.add_argument("--index", default=None, metavar="PATH",
+                   help="Also update the SQLite SKU index at PATH (per workbook) for 'query' lookups. "
+                        "With --two-pass only duplicated SKUs are indexed.")
+
+def _add_profile_args(p: argparse.ArgumentParser):
+    p.add_argument("--profile", action="store_true",
+                   help="Print per-stage, per-workbook and per-sheet timings (wall, CPU, rows, memory) to stderr.")
+    p.add_argument("--profile-json", default=None, metavar="PATH",
+                   help="Write the profiling spans as JSON to PATH. Set PYTHONTRACEMALLOC=1 to include tracemalloc peaks.")
+
+def build_parser():
+    p = argparse.ArgumentParser(
+        description="Find SKUs that appear in more than one Excel workbook.",
+        epilog="Subcommands: 'scan' (write a partial result for some files) and 'merge' (combine "
+               "partials into the report) split a run across machines; 'query' looks SKUs up in an "
+               "index written with --index; 'delta' reports what changed since the previous delta run. "
+               "See '<command> --help'.")
+    _add_input_args(p)
+    _add_report_args(p)
+    p.add_argument("--dedupe-identical", action="store_true",
+                   help="Parse byte-identical copies of a workbook once; the copies are listed on an Identical_Files sheet "
+                        "instead of showing up as cross-workbook duplicates.")
+    p.add_argument("--two-pass", action="store_true",
+                   help="Find duplicated SKUs from per-workbook SKU sets first, then collect details for those only (lower memory).")
+    _add_profile_args(p)
     return p
 
-def main(argv=None):
-    argv = argv or sys.argv[1:]
-    args = build_parser().parse_args(argv)
+def build_scan_parser():
+    p = argparse.ArgumentParser(prog="sku-dupe-finder scan",
+                                description="Scan a subset of workbooks and write a mergeable partial result.")
+    _add_input_args(p)
+    p.add_argument("--out", required=True, help="Path of the partial result file to write (e.g. node1.skpart).")
+    _add_profile_args(p)
+    return p
+
+def build_merge_parser():
+    p = argparse.ArgumentParser(prog="sku-dupe-finder merge",
+                                description="Combine partial results (in any grouping) into the final report.")
+    p.add_argument("partials", nargs="+", help="Partial result files written by 'scan' or 'merge --save-partial'.")
+    _add_report_args(p, out_default=None)
+    p.add_argument("--save-partial", default=None, metavar="PATH",
+                   help="Write the combined partial result to PATH (for merging in a tree); "
+                        "no report is written unless --out is given as well.")
+    _add_profile_args(p)
+    return p
+
+def build_query_parser():
+    p = argparse.ArgumentParser(prog="sku-dupe-finder query",
+                                description="Look up which workbooks (and sheets/rows) contain the given SKUs.")
+    p.add_argument("skus", nargs="+", help="SKUs to look up (normalized like the report: case, spaces, 123.0).")
+    p.add_argument("--index", required=True, metavar="PATH", help="SQLite index written by a run with --index.")
+    p.add_argument("--files-only", action="store_true", help="Print only the workbook names per SKU.")
+    return p
+
+def build_delta_parser():
+    p = argparse.ArgumentParser(prog="sku-dupe-finder delta",
+                                description="Report what changed since the previous delta run: newly duplicated SKUs, "
+                                            "resolved duplicates and duplicates that gained or lost workbooks. "
+                                            "Only workbooks changed since then are parsed.")
+    _add_input_args(p)
+    p.add_argument("--state", required=True, metavar="PATH",
+                   help="Per-workbook SKU sets of the previous run (read if present) and of this run (written).")
+    p.add_argument("--out", default="sku_duplicates_delta.xlsx", help="Path to write the delta report.")
+    _add_profile_args(p)
+    return p
+
+def _formats_available(args) -> bool:
+    """False (with a message) when a requested output format needs a missing package; checked before scanning."""
+    if {"parquet", "arrow"} & set(args.formats) and importlib.util.find_spec("pyarrow") is None:
+        print("--format parquet/arrow needs pyarrow: pip install 'sku-dupe-finder[arrow]' (or pip install pyarrow).",
+              file=sys.stderr)
+        return False
+    return True
+
+def _make_profiler(args) -> Profiler:
+    return Profiler() if args.profile or args.profile_json else NULL_PROFILER
 
-    files = find_excel_files(args.inputs, recursive=args.recursive)
+def _report_profile(args, profiler):
+    if args.profile:
+        print(profiler.format_table(), file=sys.stderr)
+    if args.profile_json:
+        profiler.write_json(args.profile_json)
+
+def _iter_files(args):
+    return iter_excel_files(args.inputs, recursive=args.recursive, include=args.files, exclude=args.exclude_files,
+                            max_depth=args.max_depth, modified_after=args.modified_after,
+                            modified_before=args.modified_before)
+
+def _no_files():
+    print("No workbooks found. Check the paths or use --recursive for folders.", file=sys.stderr)
+
+def _find_files(args, profiler):
+    with profiler.span("find_excel_files") as span:
+        files = list(_iter_files(args))
+        span.rows = len(files)
     if not files:
-        print("No .xlsx files found. Check the paths or use --recursive for folders.", file=sys.stderr)
-        return 2
+        _no_files()
+    return files
 
-    details_df, presence_counts, presence_bool, read_errors, sku_col_map = analyze(
-        files,
-        sku_cols=args.sku_columns,
-        patterns=args.sku_col_patterns,
-        include_within_workbook_dupes=args.include_within_workbook_dupes,
-    )
+def _stream_files(args, found):
+    """Lazy discovery for --pipeline: an iterator over the files (recorded in ``found``), or None if there are none."""
+    it = _iter_files(args)
+    first = next(it, None)
+    if first is None:
+        _no_files()
+        return None
 
-    write_report(
-        out_path=args.out,
-        details_df=details_df,
-        presence_counts=presence_counts,
-        presence_bool=presence_bool,
-        read_errors=read_errors,
-        sku_col_map=sku_col_map,
-        only_across_workbooks=not args.include_within_workbook_dupes,
-    )
+    def _record():
+        for fp in itertools.chain([first], it):
+            found.append(fp)
+            yield fp
+    return _record()
+
+def _check_similar_threshold(parser, args):
+    if args.similar_workbooks is not None and not 0 < args.similar_workbooks <= 1:
+        parser.error("--similar-workbooks THRESHOLD must be in (0, 1]")
+
+def _make_signatures(args):
+    """A WorkbookSignatures for analyze() to fill when --similar-workbooks is given, else None."""
+    if args.similar_workbooks is None:
+        return None
+    from .minhash import WorkbookSignatures
+
+    return WorkbookSignatures()
+
+def _similar_pairs(args, profiler, signatures):
+    if signatures is None:
+        return None
+    with profiler.span("similar_workbooks", rows=len(signatures)):
+        return signatures.similar_pairs(args.similar_workbooks)
+
+def _write_report(args, profiler, result, similar=None):
+    from .core import write_report
+
+    details_df, presence_counts, presence_bool, read_errors, sku_col_map = result
+    if "xlsx" in args.formats:
+        with profiler.span("write_report", rows=len(details_df)):
+            write_report(
+                out_path=args.out,
+                details_df=details_df,
+                presence_counts=presence_counts,
+                presence_bool=presence_bool,
+                read_errors=read_errors,
+                sku_col_map=sku_col_map,
+                only_across_workbooks=not args.include_within_workbook_dupes,
+                streaming=args.stream_report,
+                overlap=args.workbook_overlap,
+                similar_workbooks=similar,
+            )
+        print(f"Wrote report to: {args.out}")
+    columnar = [f for f in args.formats if f != "xlsx"]
+    if columnar:
+        from .export import export_tables
+
+        stem = args.out[:-5] if args.out.lower().endswith(".xlsx") else args.out
+        with profiler.span("export_tables", rows=len(details_df)):
+            paths = export_tables(stem, details_df, presence_counts, read_errors, sku_col_map, formats=columnar)
+        print(f"Wrote {len(paths)} {'/'.join(columnar)} tables to: {stem}.*")
+
+def _update_index(args, profiler, details_df, workbooks):
+    if not args.index:
+        return
+    from .index import SkuIndex
 
-    print(f"Wrote report to: {args.out}")
+    with profiler.span("update_index", rows=len(details_df)), SkuIndex(args.index) as index:
+        index.update_from_details(details_df, workbooks=workbooks)
+    print(f"Updated SKU index: {args.index}")
+
+def _print_read_errors(read_errors):
     if read_errors:
         print("Some files had issues:")
         for f, e in read_errors.items():
             print(f" - {f}: {e}")
+
+def scan_main(argv):
+    args = build_scan_parser().parse_args(argv)
+    profiler = _make_profiler(args)
+    files = _find_files(args, profiler)
+    if not files:
+        return 2
+
+    from .partial import PartialResult
+
+    with profiler.span("scan", files=len(files)):
+        partial = PartialResult.scan(
+            files,
+            sku_cols=args.sku_columns,
+            patterns=args.sku_col_patterns,
+            jobs=args.jobs,
+            engine=args.engine,
+            cache_dir=args.cache_dir,
+            cache_max_bytes=args.cache_max_mb * 1024 * 1024,
+            sheet_include=args.sheets,
+            sheet_exclude=args.exclude_sheets,
+            profiler=profiler,
+            pipeline=args.pipeline,
+        )
+    with profiler.span("save_partial"):
+        partial.save(args.out)
+    _report_profile(args, profiler)
+    print(f"Wrote partial result for {len(partial.workbooks)} workbooks to: {args.out}")
+    _print_read_errors(partial.read_errors)
+    return 0
+
+def merge_main(argv):
+    parser = build_merge_parser()
+    args = parser.parse_args(argv)
+    _check_similar_threshold(parser, args)
+    if args.out is None and args.save_partial is None:
+        args.out = "sku_crossworkbook_duplicates.xlsx"
+    if args.out and not _formats_available(args):
+        return 2
+    profiler = _make_profiler(args)
+
+    from .partial import PartialResult, merge_partials
+
+    with profiler.span("merge", rows=len(args.partials)):
+        try:
+            merged = merge_partials(PartialResult.load(path) for path in args.partials)
+        except ValueError as e:
+            print(f"Cannot merge partial results: {e}", file=sys.stderr)
+            return 2
+    if args.save_partial:
+        merged.save(args.save_partial)
+        print(f"Wrote merged partial result ({len(merged.workbooks)} workbooks) to: {args.save_partial}")
+    if args.out or args.index:
+        result = merged.analyze(sparse=True, profiler=profiler)
+        if args.out:
+            signatures = _make_signatures(args)
+            if signatures is not None:
+                for fp, scans in merged.workbooks:
+                    signatures.add_scans(os.path.basename(fp), scans)
+            _write_report(args, profiler, result, _similar_pairs(args, profiler, signatures))
+        _update_index(args, profiler, result[0], [os.path.basename(fp) for fp, _ in merged.workbooks])
+    _report_profile(args, profiler)
+    _print_read_errors(merged.read_errors)
+    return 0
+
+def query_main(argv):
+    args = build_query_parser().parse_args(argv)
+    if not os.path.exists(args.index):
+        print(f"No SKU index at {args.index}. Build one with --index.", file=sys.stderr)
+        return 2
+    from .index import SkuIndex
+
+    found = False
+    with SkuIndex(args.index) as index:
+        for sku in args.skus:
+            postings = index.lookup(sku)
+            found = found or bool(postings)
+            if args.files_only:
+                files = list(dict.fromkeys(p.file for p in postings))
+                print(f"{sku}\t{', '.join(files) if files else '(not found)'}")
+                continue
+            if not postings:
+                print(f"{sku}\t(not found)")
+            for p in postings:
+                print(f"{p.sku}\t{p.file}\t{p.sheet}\t{p.column}\t{p.row}")
+    return 0 if found else 1
+
+def delta_main(argv):
+    args = build_delta_parser().parse_args(argv)
+    profiler = _make_profiler(args)
+    files = _find_files(args, profiler)
+    if not files:
+        return 2
+
+    from .delta import RunState, analyze_delta, write_delta_report
+
+    state = None
+    if os.path.exists(args.state):
+        try:
+            state = RunState.load(args.state)
+        except (OSError, ValueError, zlib.error, struct.error) as e:
+            print(f"Ignoring unreadable state file {args.state}: {e}", file=sys.stderr)
+    with profiler.span("delta", files=len(files)):
+        delta, new_state = analyze_delta(
+            files,
+            state,
+            sku_cols=args.sku_columns,
+            patterns=args.sku_col_patterns,
+            jobs=args.jobs,
+            engine=args.engine,
+            cache_dir=args.cache_dir,
+            cache_max_bytes=args.cache_max_mb * 1024 * 1024,
+            sheet_include=args.sheets,
+            sheet_exclude=args.exclude_sheets,
+            profiler=profiler,
+            pipeline=args.pipeline,
+        )
+        with profiler.span("write_report"):
+            write_delta_report(args.out, delta)
+        new_state.save(args.state)
+    _report_profile(args, profiler)
+    print(f"Wrote delta report to: {args.out} ({len(delta.newly_duplicated)} newly duplicated, "
+          f"{len(delta.resolved)} resolved, {len(delta.changed)} changed)")
+    _print_read_errors(delta.read_errors)
+    return 0
+
+_SUBCOMMANDS = {"scan": scan_main, "merge": merge_main, "query": query_main, "delta": delta_main}
+
+def main(argv=None):
+    argv = argv or sys.argv[1:]
+    if argv and argv[0] in _SUBCOMMANDS:
+        return _SUBCOMMANDS[argv[0]](argv[1:])
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.two_pass and args.workbook_overlap:
+        parser.error("--workbook-overlap needs every workbook's full SKU set; it can't be combined with --two-pass")
+    _check_similar_threshold(parser, args)
+    if not _formats_available(args):
+        return 2
+
+    profiler = _make_profiler(args)
+    if args.pipeline and not (args.two_pass or args.dedupe_identical):
+        files = []  # filled in as discovery proceeds
+        inputs = _stream_files(args, files)
+    else:
+        files = inputs = _find_files(args, profiler)
+    if not inputs:
+        return 2
+
+    # pandas/numpy/openpyxl load here, once there is something to analyze
+    from .core import analyze
+
+    signatures = _make_signatures(args)
+    result = analyze(
+        inputs,
+        sku_cols=args.sku_columns,
+        patterns=args.sku_col_patterns,
+        include_within_workbook_dupes=args.include_within_workbook_dupes,
+        jobs=args.jobs,
+        engine=args.engine,
+        two_pass=args.two_pass,
+        cache_dir=args.cache_dir,
+        cache_max_bytes=args.cache_max_mb * 1024 * 1024,
+        sparse=True,
+        profiler=profiler,
+        sheet_include=args.sheets,
+        sheet_exclude=args.exclude_sheets,
+        dedupe_identical=args.dedupe_identical,
+        pipeline=args.pipeline,
+        signatures=signatures,
+    )
+    _write_report(args, profiler, result, _similar_pairs(args, profiler, signatures))
+    _update_index(args, profiler, result[0], [os.path.basename(f) for f in files if f not in result[3]])
+    _report_profile(args, profiler)
+    _print_read_errors(result[3])
     return 0
 
 if __name__ == "__main__":
@@ -1,8 +1,23 @@
 from __future__ import annotations
+import csv
+import fnmatch
+import functools
+import io
 import os
+import posixpath
 import re
-from typing import Dict, List, Tuple, Iterable
+import time
+import zipfile
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Dict, List, NamedTuple, Tuple, Iterable, Iterator
+from xml.etree import ElementTree
+import numpy as np
 import pandas as pd
+from .discovery import WORKBOOK_EXTENSIONS, find_excel_files, find_identical_files  # noqa: F401  (re-exported)
+from .presence import PresenceMatrix
+from .profiling import NULL_PROFILER, Profiler, Span
+from openpyxl.cell.cell import ERROR_CODES
 
 DEFAULT_SKU_COL_PATTERNS = [
     r"\bsku\b",
@@ -15,6 +30,15 @@ DEFAULT_SKU_COL_PATTERNS = [
     r"\bstyle\s*code\b",
 ]
 
+_WS_RE = re.compile(r"\s+")
+# Already-clean text SKUs: printable ASCII without quotes, single inner spaces and not
+# numeric-looking. For these normalize_sku() reduces to str.upper().
+_SIMPLE_SKU_RE = re.compile(r"(?![0-9]*\.?[0-9]*\Z)[!#-&(-~]+(?: [!#-&(-~]+)*")
+# ASCII integers ("123", "0123", "123.0", "123.") short enough for float() to be exact.
+_FAST_INT_RE = re.compile(r"[0-9]{1,15}(?:\.0*)?|\.0+")
+_TRAILING_ZERO_FRAC_RE = re.compile(r"\.0*\Z")
+_NULL_TOKENS = frozenset({"", "N/A", "NA", "NONE", "NULL", "-"})
+
 def normalize_sku(val):
     """Normalize SKU values to comparable strings."""
     if pd.isna(val):
@@ -26,20 +50,98 @@ def normalize_sku(val):
     except Exception:
         pass
     s = str(val).strip()
-    s = re.sub(r"\s+", " ", s)
+    s = _WS_RE.sub(" ", s)
     s = s.strip().strip('"').strip("'").upper()
-    if s in {"", "N/A", "NA", "NONE", "NULL", "-"}:
+    if s in _NULL_TOKENS:
         return None
     return s
 
+def _normalize_unique_strings(uniques: np.ndarray) -> np.ndarray:
+    """normalize_sku() over an array of distinct str values, using .str ops for the common shapes."""
+    out = np.empty(len(uniques), dtype=object)
+    stripped = pd.Series(uniques, dtype=object).str.strip()
+
+    simple = stripped.str.fullmatch(_SIMPLE_SKU_RE).to_numpy(dtype=bool)
+    upper = stripped[simple].str.upper()
+    out[simple] = upper.to_numpy(dtype=object)
+    out[np.flatnonzero(simple)[upper.isin(_NULL_TOKENS).to_numpy()]] = None
+
+    rest = stripped[~simple]
+    fast = rest.str.fullmatch(_FAST_INT_RE).to_numpy(dtype=bool)
+    ints = rest[fast]
+    dotted = ints.str.contains(".", regex=False)
+    if dotted.any():
+        ints = ints.where(~dotted, ints[dotted].str.replace(_TRAILING_ZERO_FRAC_RE, "", regex=True))
+    ints = ints.str.lstrip("0")
+    out[ints.index] = ints.mask(ints.eq(""), "0").to_numpy(dtype=object)
+
+    # Everything else (quotes, odd whitespace, non-ASCII, fractions, huge numbers) is rare
+    # enough to go through the scalar function, which keeps the results identical.
+    slow = rest.index[~fast]
+    out[slow] = [normalize_sku(v) for v in uniques[slow]]
+    return out
+
+def normalize_sku_series(series: pd.Series) -> pd.Series:
+    """Vectorized equivalent of ``series.map(normalize_sku)``.
+
+    Distinct string values are normalized once and broadcast back via
+    ``pd.factorize`` codes. Returns an object Series aligned with ``series``
+    with None for blank/NA cells.
+    """
+    values = series.to_numpy(dtype=object, na_value=None)
+    out = np.full(len(values), None, dtype=object)
+    if pd.api.types.infer_dtype(values, skipna=True) in ("string", "empty"):
+        is_str = pd.notna(values)
+    else:
+        is_str = np.fromiter((isinstance(v, str) for v in values), dtype=bool, count=len(values))
+        for i in np.flatnonzero(~is_str & pd.notna(values)):
+            out[i] = normalize_sku(values[i])
+    if is_str.any():
+        codes, uniques = pd.factorize(values[is_str])
+        out[is_str] = _normalize_unique_strings(np.asarray(uniques, dtype=object))[codes]
+    return pd.Series(out, index=series.index, dtype=object)
+
 def _compile_patterns(patterns: Iterable[str] | None):
     if not patterns:
         patterns = DEFAULT_SKU_COL_PATTERNS
     return [re.compile(p, flags=re.IGNORECASE) for p in patterns]
 
-def find_sku_columns(df: pd.DataFrame, explicit_cols: List[str] | None = None, patterns: Iterable[str] | None = None) -> List[str]:
-    """Return a list of columns that likely contain SKUs (or explicit ones if provided)."""
-    cols = [str(c).strip() for c in df.columns]
+class SheetFilter:
+    """Sheet-name filter built from include/exclude patterns.
+
+    Patterns are case-insensitive globs ("Pivot*", "Q? data") unless prefixed
+    with "re:" ("re:^notes?$"), which makes them regular expressions searched
+    in the name. A sheet is kept when it matches some include pattern (or none
+    are given) and no exclude pattern.
+    """
+
+    def __init__(self, include: Iterable[str] | None = None, exclude: Iterable[str] | None = None):
+        self.include = list(include or [])
+        self.exclude = list(exclude or [])
+        self._include = [self._compile(p) for p in self.include]
+        self._exclude = [self._compile(p) for p in self.exclude]
+
+    @staticmethod
+    def _compile(pattern: str):
+        if pattern.startswith("re:"):
+            return re.compile(pattern[3:], flags=re.IGNORECASE)
+        return re.compile("^" + fnmatch.translate(pattern), flags=re.IGNORECASE)
+
+    def __call__(self, sheet_name: str) -> bool:
+        if self._include and not any(rx.search(sheet_name) for rx in self._include):
+            return False
+        return not any(rx.search(sheet_name) for rx in self._exclude)
+
+    def __bool__(self):
+        return bool(self.include or self.exclude)
+
+def _sheet_filter(include: Iterable[str] | None, exclude: Iterable[str] | None) -> SheetFilter | None:
+    sheets = SheetFilter(include, exclude)
+    return sheets if sheets else None
+
+def _header_sku_columns(cols: List[str], explicit_cols: List[str] | None = None,
+                        patterns: Iterable[str] | None = None) -> List[str]:
+    """Header-only part of find_sku_columns(): explicit names, else regex matches (no fallback)."""
     if explicit_cols:
         wanted = set(c.strip().lower() for c in explicit_cols)
         return [c for c in cols if c.lower() in wanted]
@@ -51,13 +153,6 @@ def find_sku_columns(df: pd.DataFrame, explicit_cols: List[str] | None = None, p
             if rx.search(col):
                 candidates.append(col)
                 break
-    if not candidates:
-        # Fallback: a first column heuristic if looks alphanumeric
-        first_col = cols[0]
-        sample_series = df[first_col].dropna().astype(str).head(50)
-        alnum_ratio = (sample_series.str.contains(r"[A-Za-z0-9]").mean()) if len(sample_series) else 0
-        if alnum_ratio > 0.5:
-            candidates = [first_col]
     # de-duplicate preserving order
     seen = set()
     out = []
@@ -67,112 +162,1276 @@ def find_sku_columns(df: pd.DataFrame, explicit_cols: List[str] | None = None, p
             out.append(c); seen.add(lc)
     return out
 
-def find_excel_files(inputs: List[str], recursive: bool = False) -> List[str]:
-    files = []
-    for p in inputs:
-        if os.path.isdir(p):
-            for root, dirs, fs in os.walk(p):
-                for name in fs:
-                    if name.lower().endswith(".xlsx"):
-                        files.append(os.path.join(root, name))
-                if not recursive:
+_SKU_SAMPLE_VALUES = 50
+# Rows of column 0 read to decide the fallback before loading the whole column.
+_FALLBACK_SAMPLE_ROWS = 500
+
+def _looks_like_sku_column(values: pd.Series) -> bool:
+    """First-column fallback: most of the first 50 non-blank values are alphanumeric."""
+    sample_series = values.dropna().astype(str).head(_SKU_SAMPLE_VALUES)
+    alnum_ratio = (sample_series.str.contains(r"[A-Za-z0-9]").mean()) if len(sample_series) else 0
+    return alnum_ratio > 0.5
+
+def _fallback_verdict(sample: pd.Series, complete: bool) -> bool | None:
+    """_looks_like_sku_column() of a whole column, decided from its first rows.
+
+    None when ``sample`` holds fewer than the 50 values the check looks at and
+    is not the ``complete`` column; then only the full column can tell.
+    """
+    if complete or sample.notna().sum() >= _SKU_SAMPLE_VALUES:
+        return bool(_looks_like_sku_column(sample))
+    return None
+
+def find_sku_columns(df: pd.DataFrame, explicit_cols: List[str] | None = None, patterns: Iterable[str] | None = None) -> List[str]:
+    """Return a list of columns that likely contain SKUs (or explicit ones if provided)."""
+    cols = [str(c).strip() for c in df.columns]
+    out = _header_sku_columns(cols, explicit_cols=explicit_cols, patterns=patterns)
+    if not out and not explicit_cols:
+        # Fallback: a first column heuristic if looks alphanumeric
+        first_col = cols[0]
+        if _looks_like_sku_column(df[first_col]):
+            out = [first_col]
+    return out
+
+class SheetScan(NamedTuple):
+    """Normalized SKU occurrences of one sheet; blank cells are already dropped."""
+    sheet: str
+    columns: List[str]
+    # One (column, excel row numbers, normalized skus) triple per detected column.
+    occurrences: List[Tuple[str, np.ndarray, np.ndarray]]
+
+def _scan_workbook(fp: str, sku_cols: List[str] | None = None, patterns: Iterable[str] | None = None,
+                   profiler=NULL_PROFILER, sheets: SheetFilter | None = None,
+                   excel_engine: str = "openpyxl") -> Tuple[List[SheetScan], str | None]:
+    """Parse one workbook. Returns (sheet scans, error message or None); runs in pool workers too.
+
+    Each sheet's header row is read first to pick the SKU columns; only those
+    (or column 0 for the fallback check) are then loaded, and sheets without
+    SKU columns are skipped without parsing their bodies. Sheets rejected by
+    ``sheets`` are not read at all. ``excel_engine`` is pd.ExcelFile's engine
+    ("pyxlsb" for .xlsb and "odf" for .ods, which need those packages installed).
+    """
+    try:
+        with profiler.span("open_workbook"):
+            book = pd.ExcelFile(fp, engine=excel_engine)
+    except Exception as e:
+        return [], f"Failed to read: {e}"
+    scans = []
+    try:
+        for sheet_name in book.sheet_names:
+            if sheets is not None and not sheets(sheet_name):
+                continue
+            with profiler.span("sheet", sheet=sheet_name) as span:
+                scan = _scan_sheet_usecols(book, sheet_name, sku_cols, patterns, profiler)
+                span.rows = _scan_rows([scan]) if scan is not None else 0
+            if scan is not None:
+                scans.append(scan)
+    except Exception as e:
+        return [], f"Failed to read: {e}"
+    finally:
+        book.close()
+    return scans, None
+
+def _scan_sheet_usecols(book: pd.ExcelFile, sheet_name: str, sku_cols: List[str] | None,
+                        patterns: Iterable[str] | None, profiler=NULL_PROFILER) -> SheetScan | None:
+    """Header pre-scan, then read_excel of the SKU columns only (usecols)."""
+    with profiler.span("read_header"):
+        header = book.parse(sheet_name, nrows=0, dtype=str)
+    cols = [str(c).strip() for c in header.columns]
+    if not cols:
+        # blank header row: column names depend on the body, so read the sheet as a whole
+        with profiler.span("read_excel") as span:
+            df = book.parse(sheet_name, dtype=str)
+            span.rows = len(df)
+        if df.empty:
+            return None
+        df.columns = [str(c).strip() for c in df.columns]
+        chosen = find_sku_columns(df, explicit_cols=sku_cols, patterns=patterns)
+    else:
+        with profiler.span("find_sku_columns"):
+            chosen = _header_sku_columns(cols, explicit_cols=sku_cols, patterns=patterns)
+        fallback = not chosen and not sku_cols
+        if not chosen and not fallback:
+            return None
+        positions = [0] if fallback else [cols.index(c) for c in chosen]
+        if fallback:
+            # a non-SKU tab is usually rejected from its first rows, without reading the rest
+            with profiler.span("read_sample") as span:
+                sample = book.parse(sheet_name, usecols=positions, nrows=_FALLBACK_SAMPLE_ROWS, dtype=str)
+                span.rows = len(sample)
+            complete = len(sample) < _FALLBACK_SAMPLE_ROWS
+            if sample.empty and complete:
+                return None
+            verdict = _fallback_verdict(sample.iloc[:, 0], complete)
+            if verdict is False:
+                return None
+            fallback = verdict is None
+        with profiler.span("read_excel") as span:
+            df = book.parse(sheet_name, usecols=positions, dtype=str)
+            span.rows = len(df)
+        if df.empty:
+            return None
+        df.columns = [cols[i] for i in positions]
+        if fallback and not _looks_like_sku_column(df.iloc[:, 0]):
+            return None
+        if not chosen:
+            chosen = [cols[0]]
+    if not chosen:
+        return None
+    occurrences = []
+    with profiler.span("normalize_sku", rows=len(df) * len(chosen)):
+        for col in chosen:
+            series = normalize_sku_series(df[col]).dropna()
+            occurrences.append((col, series.index.to_numpy(dtype=np.int64) + 2, series.to_numpy(dtype=object)))
+    return SheetScan(sheet_name, chosen, occurrences)
+
+_CSV_CHUNK_ROWS = 100_000
+
+def _csv_delimiter(f) -> str:
+    """Delimiter guessed from the start of a CSV file (',' unless ';', tab or '|' fits better)."""
+    sample = f.read(1 << 16)
+    f.seek(0)
+    if isinstance(sample, bytes):
+        sample = sample.decode("utf-8", errors="replace")
+    try:
+        return csv.Sniffer().sniff(sample, delimiters=",;\t|").delimiter
+    except csv.Error:
+        return ","
+
+def _scan_csv(fp, sku_cols: List[str] | None = None, patterns: Iterable[str] | None = None,
+              profiler=NULL_PROFILER, sheets: SheetFilter | None = None) -> Tuple[List[SheetScan], str | None]:
+    """Scan a CSV file as one sheet named after the file (like Excel opens it).
+
+    The header is read first to pick the SKU columns, then only those columns
+    are read, in chunks of _CSV_CHUNK_ROWS rows, so memory stays flat however
+    long the file is. Values are kept as text (leading zeros survive).
+    """
+    sheet_name = os.path.splitext(os.path.basename(getattr(fp, "name", fp)))[0]
+    if sheets is not None and not sheets(sheet_name):
+        return [], None
+    options = dict(dtype=str, encoding="utf-8-sig", encoding_errors="replace", skip_blank_lines=False)
+    try:
+        with profiler.span("sheet", sheet=sheet_name) as span, \
+                (open(fp, "rb") if isinstance(fp, (str, os.PathLike)) else fp) as f:
+            options["sep"] = _csv_delimiter(f)
+            with profiler.span("read_header"):
+                cols = [str(c).strip() for c in pd.read_csv(f, nrows=0, **options).columns]
+            f.seek(0)
+            with profiler.span("find_sku_columns"):
+                chosen = _header_sku_columns(cols, explicit_cols=sku_cols, patterns=patterns)
+            fallback = not chosen and not sku_cols
+            if not chosen and not fallback:
+                return [], None
+            positions = [0] if fallback else [cols.index(c) for c in chosen]
+            names = [cols[i] for i in positions]
+            if fallback:
+                with profiler.span("read_sample") as sample_span:
+                    sample = pd.read_csv(f, usecols=positions, nrows=_FALLBACK_SAMPLE_ROWS, **options)
+                    sample_span.rows = len(sample)
+                f.seek(0)
+                verdict = _fallback_verdict(sample.iloc[:, 0], len(sample) < _FALLBACK_SAMPLE_ROWS)
+                if verdict is False:
+                    return [], None
+                fallback = verdict is None  # else decided by the first chunk, as before
+            parts: Dict[str, List[pd.Series]] = {c: [] for c in names}
+            n_rows = 0
+            with profiler.span("read_csv") as read_span:
+                for chunk in pd.read_csv(f, usecols=positions, chunksize=_CSV_CHUNK_ROWS, **options):
+                    chunk.columns = names
+                    if fallback:
+                        if not _looks_like_sku_column(chunk.iloc[:, 0]):
+                            return [], None
+                        fallback = False
+                    n_rows += len(chunk)
+                    with profiler.span("normalize_sku", rows=len(chunk) * len(names)):
+                        for col in names:
+                            parts[col].append(normalize_sku_series(chunk[col]).dropna())
+                read_span.rows = n_rows
+            occurrences = []
+            for col in names:
+                series = pd.concat(parts[col]) if parts[col] else pd.Series([], dtype=object)
+                occurrences.append((col, series.index.to_numpy(dtype=np.int64) + 2, series.to_numpy(dtype=object)))
+            scan = SheetScan(sheet_name, names, occurrences)
+            span.rows = _scan_rows([scan])
+    except pd.errors.EmptyDataError:
+        return [], None  # zero-byte file, like an empty sheet
+    except Exception as e:
+        return [], f"Failed to read: {e}"
+    return ([scan] if n_rows else []), None
+
+def _scan_rows(scans: List[SheetScan]) -> int:
+    """Number of SKU cells kept across ``scans``."""
+    return sum(len(skus) for scan in scans for _, _, skus in scan.occurrences)
+
+def _scan_sheet_profiled(profiler, rows: Iterator[tuple], sheet_name: str, sku_cols: List[str] | None,
+                         patterns: Iterable[str] | None) -> SheetScan | None:
+    """_scan_sheet_streaming() inside a "sheet" span whose rows are the SKU cells kept."""
+    with profiler.span("sheet", sheet=sheet_name) as span:
+        scan = _scan_sheet_streaming(rows, sheet_name, sku_cols, patterns)
+        span.rows = _scan_rows([scan]) if scan is not None else 0
+    return scan
+
+def _excel_header_names(row: tuple) -> List[str]:
+    """Column labels the way pd.read_excel builds them: "Unnamed: i" for blanks, ".N" suffixes for repeats.
+
+    Mirrors the python parser's renaming: named columns are handled before
+    unnamed ones, and a suffixed name that already occurs in the header is
+    skipped (SKU, SKU, SKU.1 -> SKU, SKU.2, SKU.1).
+    """
+    names = []
+    unnamed = []
+    for i, v in enumerate(row):
+        col = _excel_cell_to_str(v)
+        if col is None or col == "":
+            col = f"Unnamed: {i}"
+            unnamed.append(i)
+        names.append(col)
+    counts: Dict[str, int] = {}
+    is_unnamed = set(unnamed)
+    for i in [i for i in range(len(names)) if i not in is_unnamed] + unnamed:
+        col = old_col = names[i]
+        cur = counts.get(col, 0)
+        while cur > 0:
+            counts[old_col] = cur + 1
+            col = f"{old_col}.{cur}"
+            cur = cur + 1 if col in names else counts.get(col, 0)
+        names[i] = col
+        counts[col] = cur + 1
+    return [c.strip() for c in names]
+
+def _excel_cell_to_str(v):
+    """Cell value as read_excel(dtype=str) would give it (None for blanks)."""
+    if v is None:
+        return None
+    if isinstance(v, str):
+        return v
+    if isinstance(v, float) and v.is_integer():
+        return str(int(v))
+    return str(v)
+
+def _is_blank_cell(v) -> bool:
+    return v is None or v == ""
+
+# read_excel turns these strings into NaN before dtype=str applies: pandas' default
+# ``na_values`` as listed in the read_csv/read_excel docs (pandas >= 2.0 adds "None").
+_PANDAS_NA_VALUES = frozenset({
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN",
+    "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null",
+})
+# Error cells come back from values_only reads as their "#..." text.
+_EXCEL_NA_STRINGS = _PANDAS_NA_VALUES | frozenset(ERROR_CODES)
+
+def _scan_sheet_streaming(rows: Iterator[tuple], sheet_name: str, sku_cols: List[str] | None,
+                          patterns: Iterable[str] | None) -> SheetScan | None:
+    """Detect SKU columns from the header row, then keep only those columns of the body rows."""
+    header = next(rows, None)
+    if header is None:
+        return None
+    cols = _excel_header_names(header)
+    chosen = _header_sku_columns(cols, explicit_cols=sku_cols, patterns=patterns)
+    fallback = not chosen and not sku_cols
+    if fallback:
+        # read_excel pads a short/blank header to the widest row, so column 0 always exists
+        chosen = [cols[0] if cols else "Unnamed: 0"]
+    if not chosen:
+        return None
+
+    indices = [0] if fallback else [cols.index(c) for c in chosen]
+    if hasattr(rows, "select"):
+        rows.select(indices)
+    row_numbers: List[int] = []
+    raw: List[List[str | None]] = [[] for _ in chosen]
+    has_body = False
+    seen = 0  # non-blank fallback values so far; the check needs only the first 50
+    for row_number, row in enumerate(rows, start=2):
+        width = len(row)
+        values = [row[i] if i < width else None for i in indices]
+        if all(_is_blank_cell(v) for v in values):
+            # read_excel keeps a sheet whose SKU columns are blank as long as any cell has data
+            has_body = has_body or not all(_is_blank_cell(v) for v in row)
+            continue
+        has_body = True
+        row_numbers.append(row_number)
+        for bucket, v in zip(raw, values):
+            v = _excel_cell_to_str(v)
+            bucket.append(None if v in _EXCEL_NA_STRINGS else v)
+        if fallback and raw[0][-1] is not None:
+            seen += 1
+            if seen == _SKU_SAMPLE_VALUES:
+                if not _looks_like_sku_column(pd.Series(raw[0], dtype=object)):
+                    return None  # not a SKU tab: skip the rest of the sheet
+                fallback = False
+    if not has_body:
+        return None
+
+    rows_arr = np.asarray(row_numbers, dtype=np.int64)
+    if fallback and not _looks_like_sku_column(pd.Series(raw[0], dtype=object)):
+        return None
+    occurrences = []
+    for col, values in zip(chosen, raw):
+        series = normalize_sku_series(pd.Series(values, dtype=object)).dropna()
+        occurrences.append((col, rows_arr[series.index.to_numpy()], series.to_numpy(dtype=object)))
+    return SheetScan(sheet_name, chosen, occurrences)
+
+def _scan_workbook_openpyxl(fp: str, sku_cols: List[str] | None = None, patterns: Iterable[str] | None = None,
+                            profiler=NULL_PROFILER, sheets: SheetFilter | None = None
+                            ) -> Tuple[List[SheetScan], str | None]:
+    """Streaming variant of _scan_workbook(): read-only openpyxl, SKU columns only."""
+    from openpyxl import load_workbook
+    try:
+        wb = load_workbook(fp, read_only=True, data_only=True, keep_links=False)
+    except Exception as e:
+        return [], f"Failed to read: {e}"
+    scans = []
+    try:
+        for ws in wb.worksheets:
+            if sheets is not None and not sheets(ws.title):
+                continue  # read-only worksheets are only decompressed when iterated
+            ws.reset_dimensions()
+            scan = _scan_sheet_profiled(profiler, ws.iter_rows(values_only=True), ws.title, sku_cols, patterns)
+            if scan is not None:
+                scans.append(scan)
+    except Exception as e:
+        return [], f"Failed to read: {e}"
+    finally:
+        wb.close()
+    return scans, None
+
+_SSML = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+_DOC_REL = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+_PKG_REL = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+_ROW_TAG, _CELL_TAG, _SHEET_DATA_TAG = _SSML + "row", _SSML + "c", _SSML + "sheetData"
+_V_TAG, _IS_TAG, _T_TAG, _R_TAG = _SSML + "v", _SSML + "is", _SSML + "t", _SSML + "r"
+# Stand-in for cells outside the selected columns: non-blank, never converted.
+_UNREAD = object()
+
+def _xml_text(node) -> str:
+    """Plain text of an <si>/<is> node: the <t> child plus rich-text runs (phonetic runs skipped)."""
+    parts = []
+    for child in node:
+        if child.tag == _T_TAG:
+            parts.append(child.text or "")
+        elif child.tag == _R_TAG:
+            t = child.find(_T_TAG)
+            if t is not None:
+                parts.append(t.text or "")
+    return "".join(parts)
+
+def _zip_rels(zf: zipfile.ZipFile, part: str) -> Dict[str, Tuple[str, str]]:
+    """Relationship id -> (type, resolved part path) for ``part``."""
+    folder, name = posixpath.split(part)
+    rels_path = posixpath.join(folder, "_rels", name + ".rels")
+    if rels_path not in zf.namelist():
+        return {}
+    rels = {}
+    for rel in ElementTree.fromstring(zf.read(rels_path)).iter(_PKG_REL + "Relationship"):
+        target = rel.get("Target", "")
+        target = target.lstrip("/") if target.startswith("/") else posixpath.normpath(posixpath.join(folder, target))
+        rels[rel.get("Id")] = (rel.get("Type", ""), target)
+    return rels
+
+_COLUMN_LETTERS: Dict[str, int] = {}
+
+def _xlsx_column_index(ref: str) -> int:
+    """0-based column index of a cell reference such as "AB12"."""
+    letters = ref.rstrip("0123456789")
+    idx = _COLUMN_LETTERS.get(letters)
+    if idx is None:
+        idx = 0
+        for ch in letters.upper():
+            idx = idx * 26 + ord(ch) - 64
+        idx = _COLUMN_LETTERS[letters] = idx - 1
+    return idx
+
+class _XlsxWorkbookParts:
+    """Sheet list, shared strings and date styles of an .xlsx package, loaded once."""
+
+    def __init__(self, zf: zipfile.ZipFile):
+        from openpyxl.styles.numbers import BUILTIN_FORMATS, is_date_format, is_timedelta_format
+        from openpyxl.utils.datetime import CALENDAR_MAC_1904, CALENDAR_WINDOWS_1900
+
+        workbook = next(target for kind, target in _zip_rels(zf, "").values() if kind.endswith("/officeDocument"))
+        rels = _zip_rels(zf, workbook)
+        root = ElementTree.fromstring(zf.read(workbook))
+        pr = root.find(_SSML + "workbookPr")
+        self.epoch = CALENDAR_MAC_1904 if pr is not None and pr.get("date1904") in ("1", "true") else CALENDAR_WINDOWS_1900
+        self.sheets: List[Tuple[str, str]] = []
+        for sheet in root.iter(_SSML + "sheet"):
+            kind, target = rels.get(sheet.get(_DOC_REL + "id"), ("", ""))
+            if kind.endswith("/worksheet"):
+                self.sheets.append((sheet.get("name"), target))
+
+        self.shared_strings: List[str] = []
+        self.date_styles: set = set()
+        self.timedelta_styles: set = set()
+        for kind, target in rels.values():
+            if kind.endswith("/sharedStrings"):
+                with zf.open(target) as f:
+                    for _, node in ElementTree.iterparse(f):
+                        if node.tag == _SSML + "si":
+                            self.shared_strings.append(_xml_text(node).replace("x005F_", ""))
+                            node.clear()
+            elif kind.endswith("/styles"):
+                styles = ElementTree.fromstring(zf.read(target))
+                custom = {int(n.get("numFmtId")): n.get("formatCode")
+                          for n in styles.iter(_SSML + "numFmt")}
+                xfs = styles.find(_SSML + "cellXfs")
+                for idx, xf in enumerate(xfs if xfs is not None else []):
+                    fmt_id = int(xf.get("numFmtId", 0))
+                    fmt = custom[fmt_id] if fmt_id in custom else BUILTIN_FORMATS.get(fmt_id)
+                    if is_date_format(fmt):
+                        self.date_styles.add(idx)
+                    if is_timedelta_format(fmt):
+                        self.timedelta_styles.add(idx)
+
+    def cell_value(self, c):
+        """Value of a <c> element the way openpyxl's read-only, data_only reader returns it."""
+        from openpyxl.utils.datetime import from_excel, from_ISO8601
+
+        t = c.get("t", "n")
+        if t == "inlineStr":
+            node = c.find(_IS_TAG)
+            return _xml_text(node) if node is not None else None
+        value = c.findtext(_V_TAG) or None
+        if value is None:
+            return None
+        if t == "n":
+            value = float(value) if ("." in value or "E" in value or "e" in value) else int(value)
+            style = int(c.get("s") or 0)
+            if style in self.date_styles:
+                try:
+                    value = from_excel(value, self.epoch, timedelta=style in self.timedelta_styles)
+                except (OverflowError, ValueError):
+                    value = "#VALUE!"
+        elif t == "s":
+            value = self.shared_strings[int(value)]
+        elif t == "b":
+            value = bool(int(value))
+        elif t == "d":
+            value = from_ISO8601(value)
+        return value
+
+class _XlsxSheetRows:
+    """Iterate a worksheet part as row tuples (row 1 first, gaps filled with empty rows).
+
+    After select(indices) only those columns are decoded; other non-empty cells are
+    returned as a placeholder, so wide sheets cost little beyond XML parsing.
+    """
+
+    def __init__(self, source, parts: _XlsxWorkbookParts):
+        self._events = ElementTree.iterparse(source, events=("start", "end"))
+        self._parts = parts
+        self._wanted = None
+        self._next_row = 1
+        self._pending: List[tuple] = []
+        self._sheet_data = None
+
+    def select(self, indices: Iterable[int]):
+        self._wanted = set(indices)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> tuple:
+        if self._pending:
+            return self._pending.pop()
+        for event, elem in self._events:
+            if event == "start":
+                if elem.tag == _SHEET_DATA_TAG:
+                    self._sheet_data = elem
+                continue
+            if elem.tag != _ROW_TAG:
+                continue
+            r = elem.get("r")
+            row_number = int(float(r)) if r else self._next_row
+            values, col = {}, -1
+            for c in elem:
+                if c.tag != _CELL_TAG:
+                    continue
+                ref = c.get("r")
+                col = _xlsx_column_index(ref) if ref else col + 1
+                if self._wanted is None or col in self._wanted:
+                    values[col] = self._parts.cell_value(c)
+                elif len(c):
+                    values[col] = _UNREAD
+            self._sheet_data.clear()  # rows are consumed; keep the tree from growing
+            row = [None] * (max(values) + 1 if values else 0)
+            for col, v in values.items():
+                row[col] = v
+            # yield empty rows for gaps, then this one (pending is popped from the end)
+            self._pending = [tuple(row)] + [()] * max(row_number - self._next_row, 0)
+            self._next_row = row_number + 1
+            return self._pending.pop()
+        raise StopIteration
+
+def _scan_workbook_xml(fp: str, sku_cols: List[str] | None = None, patterns: Iterable[str] | None = None,
+                       profiler=NULL_PROFILER, sheets: SheetFilter | None = None
+                       ) -> Tuple[List[SheetScan], str | None]:
+    """Variant of _scan_workbook() that reads the xlsx zip directly.
+
+    Shared strings are loaded once per workbook; each sheet XML is parsed
+    incrementally and only cells in the detected SKU columns are decoded.
+    """
+    scans = []
+    try:
+        with zipfile.ZipFile(fp) as zf:
+            with profiler.span("load_workbook_parts"):
+                parts = _XlsxWorkbookParts(zf)
+            for name, path in parts.sheets:
+                if sheets is not None and not sheets(name):
+                    continue
+                with zf.open(path) as f:
+                    scan = _scan_sheet_profiled(profiler, _XlsxSheetRows(f, parts), name, sku_cols, patterns)
+                if scan is not None:
+                    scans.append(scan)
+    except Exception as e:
+        return [], f"Failed to read: {e}"
+    return scans, None
+
+_SCANNERS = {
+    "pandas": _scan_workbook,
+    "openpyxl": _scan_workbook_openpyxl,
+    "xml": _scan_workbook_xml,
+}
+
+# Readers for formats the engines above don't handle, keyed by lower-case extension.
+# .xlsx/.xlsm go to the selected engine; see register_reader().
+_READERS: Dict[str, Callable] = {
+    ".csv": _scan_csv,
+    ".xlsb": functools.partial(_scan_workbook, excel_engine="pyxlsb"),
+    ".ods": functools.partial(_scan_workbook, excel_engine="odf"),
+}
+# Extensions whose scans depend on the file name (CSV sheets are named after the file),
+# so byte-identical files with different names need their own cache entries.
+_NAME_SCOPED_READERS = {".csv"}
+
+def register_reader(extension: str, scanner: Callable, name_scoped: bool = False):
+    """Read files ending in ``extension`` with ``scanner`` and pick them up in folder scans.
+
+    ``scanner(source, sku_cols, patterns, profiler=..., sheets=...)`` must return
+    (list of SheetScan, error message or None) like the built-in readers; source
+    is a path or a binary file object with a ``name``. It has to be a module-level
+    function (or functools.partial of one) so it can run in worker processes.
+    Pass ``name_scoped=True`` when its output depends on the file name (as the
+    CSV reader's sheet name does), so identical files are cached separately.
+    """
+    extension = extension.lower()
+    if not extension.startswith("."):
+        extension = "." + extension
+    _READERS[extension] = scanner
+    if name_scoped:
+        _NAME_SCOPED_READERS.add(extension)
+    else:
+        _NAME_SCOPED_READERS.discard(extension)
+    if extension not in WORKBOOK_EXTENSIONS:
+        WORKBOOK_EXTENSIONS.append(extension)
+
+def _scanner(engine: str, fp: str) -> Callable:
+    """Reader for ``fp``: the one registered for its extension, else the engine's."""
+    return _READERS.get(os.path.splitext(fp)[1].lower()) or _SCANNERS[engine]
+
+def _cache_key(cache, fp: str) -> str:
+    """ParseCache key for ``fp``, scoped by file name for readers that name sheets after the file."""
+    name, ext = os.path.splitext(os.path.basename(fp))
+    return cache.key(fp, name if ext.lower() in _NAME_SCOPED_READERS else "")
+
+def _named_bytes(fp: str, data: bytes) -> io.BytesIO:
+    source = io.BytesIO(data)
+    source.name = fp  # readers that name sheets after the file (CSV) look here
+    return source
+
+def _scan_profiled(engine: str, fp: str, sku_cols: List[str] | None, patterns: Iterable[str] | None,
+                   sheets: SheetFilter | None = None, trace_memory: bool = False, source=None):
+    """Pool-worker entry point when profiling: (scans, error, recorded span dicts).
+
+    ``source`` (a file object) is scanned instead of opening ``fp`` when given.
+    """
+    profiler = Profiler(trace_memory=trace_memory)
+    with profiler.span("file", file=os.path.basename(fp)) as span:
+        scans, error = _scanner(engine, fp)(source if source is not None else fp, sku_cols, patterns,
+                                            profiler=profiler, sheets=sheets)
+        span.rows = _scan_rows(scans)
+    return scans, error, profiler.to_dict()["spans"]
+
+_PIPELINE_IO_THREADS = 4
+
+def _read_workbook(fp: str, cache=None):
+    """Pipeline I/O stage: (cache key, cached scans or None, file bytes or None, span dict) for ``fp``."""
+    wall0, cpu0 = time.perf_counter(), time.thread_time()
+    key = scans = data = None
+    if cache is not None:
+        try:
+            key = _cache_key(cache, fp)
+        except OSError:
+            pass
+        if key is not None:
+            scans = cache.load(key)  # None when not cached
+    if scans is None:
+        with open(fp, "rb") as f:
+            data = f.read()
+    if scans is not None:
+        span = Span("cache_load", {"file": os.path.basename(fp)})
+        span.rows = _scan_rows(scans)
+    else:
+        span = Span("read", {"file": os.path.basename(fp), "bytes": len(data)})
+    span.wall_s, span.cpu_s = time.perf_counter() - wall0, time.thread_time() - cpu0
+    return key, scans, data, span.to_dict()
+
+def _scan_data(engine: str, fp: str, data: bytes, sku_cols: List[str] | None, patterns: Iterable[str] | None,
+               sheets: SheetFilter | None = None, profile: bool = False, trace_memory: bool = False):
+    """Pipeline parse stage: scan the bytes of ``fp`` read by an I/O thread; (scans, error, span dicts)."""
+    if profile:
+        return _scan_profiled(engine, fp, sku_cols, patterns, sheets, trace_memory, source=_named_bytes(fp, data))
+    scans, error = _scanner(engine, fp)(_named_bytes(fp, data), sku_cols, patterns, sheets=sheets)
+    return scans, error, []
+
+def _iter_workbook_scans_pipelined(files: Iterable[str], sku_cols: List[str] | None, patterns: Iterable[str] | None,
+                                   jobs: int = 1, engine: str = "pandas", cache=None, profiler=NULL_PROFILER,
+                                   sheets: SheetFilter | None = None, io_threads: int = _PIPELINE_IO_THREADS,
+                                   max_pending: int | None = None
+                                   ) -> Iterator[Tuple[str, List[SheetScan], str | None]]:
+    """_iter_workbook_scans() with reading, parsing and the caller's aggregation overlapped.
+
+    I/O threads read workbook bytes (or cached scans) ahead of time, parse workers
+    decode them from memory as soon as they arrive, and results are yielded in
+    input order while later workbooks are still being read and parsed. At most
+    ``max_pending`` workbooks (default: two per parse worker plus the I/O threads)
+    are in flight, which caps memory. ``files`` may be a lazy iterator such as
+    iter_excel_files(), so parsing starts before discovery has finished.
+    """
+    n_jobs = jobs if jobs > 0 else (os.cpu_count() or 1)
+    max_pending = max_pending or 2 * n_jobs + io_threads
+    io_pool = ThreadPoolExecutor(max_workers=io_threads, thread_name_prefix="sku-read")
+    # a single parse thread still overlaps decoding with reading and aggregation
+    parse_pool = ProcessPoolExecutor(max_workers=n_jobs) if n_jobs > 1 else ThreadPoolExecutor(max_workers=1)
+    options = (sku_cols, patterns, sheets, profiler.enabled, profiler.trace_memory)
+
+    def _start(fp: str) -> Future:
+        """Future of (key, from cache, scans, error, span dicts) for ``fp``."""
+        done = Future()
+
+        def _parsed(fut: Future, key, spans):
+            try:
+                scans, error, parse_spans = fut.result()
+            except Exception as e:
+                scans, error, parse_spans = [], f"Failed to read: {e}", []
+            done.set_result((key, False, scans, error, spans + parse_spans))
+
+        def _read(fut: Future):
+            try:
+                key, scans, data, span = fut.result()
+                if scans is not None:
+                    done.set_result((key, True, scans, None, [span]))
+                    return
+                parse = parse_pool.submit(_scan_data, engine, fp, data, *options)
+            except Exception as e:
+                done.set_result((None, False, [], f"Failed to read: {e}", []))
+                return
+            parse.add_done_callback(lambda f: _parsed(f, key, [span]))
+
+        io_pool.submit(_read_workbook, fp, cache).add_done_callback(_read)
+        return done
+
+    pending = deque()
+    remaining = iter(files)
+    try:
+        while True:
+            while len(pending) < max_pending:
+                fp = next(remaining, None)
+                if fp is None:
                     break
+                pending.append((fp, _start(fp)))
+            if not pending:
+                break
+            fp, done = pending.popleft()
+            key, cached, scans, error, spans = done.result()
+            if profiler.enabled:
+                profiler.attach(spans)
+            if cache is not None:
+                if cached:
+                    cache.hits += 1
+                else:
+                    cache.misses += 1
+                    if error is None and key:
+                        cache.store(key, scans)
+            yield fp, scans, error
+    finally:
+        io_pool.shutdown(cancel_futures=True)
+        parse_pool.shutdown(cancel_futures=True)
+
+def _iter_workbook_scans(files: List[str], sku_cols: List[str] | None, patterns: Iterable[str] | None,
+                         jobs: int = 1, engine: str = "pandas", cache=None, profiler=NULL_PROFILER,
+                         sheets: SheetFilter | None = None, pipeline: bool = False
+                         ) -> Iterator[Tuple[str, List[SheetScan], str | None]]:
+    """Yield (path, scans, error) in input order, parsing in a process pool when jobs != 1.
+
+    With a ParseCache, workbooks whose content and settings are already cached are
+    loaded from it and only the rest are parsed (and then stored). With a Profiler,
+    every workbook gets a "file" span (recorded in the worker when parsing in a pool).
+    ``pipeline=True`` uses _iter_workbook_scans_pipelined() instead.
+    """
+    if engine not in _SCANNERS:
+        raise ValueError(f"Unknown engine {engine!r}; expected one of {sorted(_SCANNERS)}")
+    if pipeline:
+        yield from _iter_workbook_scans_pipelined(files, sku_cols, patterns, jobs=jobs, engine=engine,
+                                                  cache=cache, profiler=profiler, sheets=sheets)
+        return
+
+    keys: Dict[str, str | None] = {}
+    if cache is not None:
+        for fp in files:
+            try:
+                keys[fp] = _cache_key(cache, fp)
+            except OSError:
+                keys[fp] = None
+    to_parse = [fp for fp in files if keys.get(fp) is None or keys[fp] not in cache]
+
+    def _parse() -> Iterator[Tuple[List[SheetScan], str | None]]:
+        n_jobs = jobs if jobs > 0 else (os.cpu_count() or 1)
+        n_jobs = min(n_jobs, len(to_parse))
+        if n_jobs <= 1:
+            for fp in to_parse:
+                yield _scan_one(fp)
+            return
+        with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+            if profiler.enabled:
+                futures = [pool.submit(_scan_profiled, engine, fp, sku_cols, patterns, sheets,
+                                       profiler.trace_memory) for fp in to_parse]
+            else:
+                futures = [pool.submit(_scanner(engine, fp), fp, sku_cols, patterns, sheets=sheets)
+                           for fp in to_parse]
+            for fut in futures:
+                try:
+                    result = fut.result()
+                except Exception as e:
+                    yield [], f"Failed to read: {e}"
+                    continue
+                if profiler.enabled:
+                    profiler.attach(result[2])
+                yield result[:2]
+
+    def _scan_one(fp: str) -> Tuple[List[SheetScan], str | None]:
+        if not profiler.enabled:
+            return _scanner(engine, fp)(fp, sku_cols, patterns, sheets=sheets)
+        with profiler.span("file", file=os.path.basename(fp)) as span:
+            result = _scanner(engine, fp)(fp, sku_cols, patterns, profiler=profiler, sheets=sheets)
+            span.rows = _scan_rows(result[0])
+        return result
+
+    parsed = _parse()
+    pending = set(to_parse)
+    for fp in files:
+        if fp in pending:
+            scans, error = next(parsed)
+            if cache is not None:
+                cache.misses += 1
+                if error is None and keys.get(fp):
+                    cache.store(keys[fp], scans)
+            yield fp, scans, error
+            continue
+        with profiler.span("cache_load", file=os.path.basename(fp)) as span:
+            scans = cache.load(keys[fp])
+            span.rows = _scan_rows(scans) if scans is not None else 0
+        if scans is None:  # entry vanished or is corrupt
+            cache.misses += 1
+            scans, error = _scan_one(fp)
+            if error is None:
+                cache.store(keys[fp], scans)
+            yield fp, scans, error
         else:
-            if os.path.isfile(p) and p.lower().endswith(".xlsx"):
-                files.append(p)
-    # unique preserve order
-    seen = set()
-    ordered = []
-    for f in files:
-        if f not in seen:
-            ordered.append(f); seen.add(f)
-    return ordered
+            cache.hits += 1
+            yield fp, scans, None
+    parsed.close()
 
-def analyze(files: List[str], sku_cols: List[str] | None = None, patterns: Iterable[str] | None = None,
-            include_within_workbook_dupes: bool = False):
-    """Core analysis. Returns (details_df, presence_counts, presence_bool_with_count, read_errors, sku_col_map)."""
-    details_rows = []
+def _sign_workbooks(results: Iterable[Tuple[str, List[SheetScan], str | None]], signatures,
+                    cache=None) -> Iterator[Tuple[str, List[SheetScan], str | None]]:
+    """Pass ``results`` through, adding each workbook's MinHash signature to ``signatures``.
+
+    With a ParseCache the signature is stored next to the workbook's cache entry,
+    so unchanged workbooks are not hashed again on later runs.
+    """
+    for fp, scans, error in results:
+        if error is None:
+            key = signature = None
+            if cache is not None:
+                try:
+                    key = _cache_key(cache, fp)  # already in the path index; no re-hash
+                except OSError:
+                    pass
+                if key is not None:
+                    signature = cache.load_signature(key, signatures.params)
+            if signature is not None and len(signature) == signatures.num_perm:
+                signatures.add(os.path.basename(fp), signature)
+            else:
+                signature = signatures.add_scans(os.path.basename(fp), scans)
+                if key is not None:
+                    cache.store_signature(key, signatures.params, signature)
+        yield fp, scans, error
+
+def _intern(table: Dict[str, int], key: str) -> int:
+    return table.setdefault(key, len(table))
+
+def _sorted_categorical(codes: np.ndarray, labels: Dict[str, int]) -> pd.Categorical:
+    """Categorical over ``labels`` (code order) with categories sorted, so sorting by it sorts by string."""
+    values = np.asarray(list(labels), dtype=object)
+    order = np.argsort(values, kind="stable")
+    rank = np.empty(len(order), dtype=np.int32)
+    rank[order] = np.arange(len(order), dtype=np.int32)
+    return pd.Categorical.from_codes(rank[codes], categories=values[order])
+
+class OccurrenceTable:
+    """Columnar accumulator of SKU occurrences.
+
+    SKU, file, sheet and column names are interned into integer ids; each added
+    column batch keeps an int32 array of SKU codes and one of row numbers.
+    """
+
+    def __init__(self):
+        self.skus: Dict[str, int] = {}
+        self.files: Dict[str, int] = {}
+        self.sheets: Dict[str, int] = {}
+        self.columns: Dict[str, int] = {}
+        self._sku_codes: List[np.ndarray] = []
+        self._rows: List[np.ndarray] = []
+        self._batches: List[Tuple[int, int, int, int]] = []  # (file id, sheet id, column id, length)
+
+    def __len__(self):
+        return sum(b[3] for b in self._batches)
+
+    def add(self, file: str, sheet: str, column: str, rows: np.ndarray, skus: np.ndarray):
+        """Append one column's occurrences (row numbers and normalized SKUs, blanks dropped)."""
+        if not len(skus):
+            return
+        local_codes, uniques = pd.factorize(np.asarray(skus, dtype=object))
+        remap = np.fromiter((_intern(self.skus, u) for u in uniques), dtype=np.int32, count=len(uniques))
+        self._sku_codes.append(remap[local_codes])
+        self._rows.append(np.asarray(rows, dtype=np.int32))
+        self._batches.append((_intern(self.files, file), _intern(self.sheets, sheet),
+                              _intern(self.columns, column), len(skus)))
+
+    def to_frame(self) -> pd.DataFrame:
+        """Details frame with categorical SKU/File/Sheet/Column and int32 RowNumber, in insertion order."""
+        batches = np.asarray(self._batches, dtype=np.int64).reshape(-1, 4)
+        lengths = batches[:, 3]
+
+        def _codes(field: np.ndarray, dtype=np.int32):
+            return np.repeat(field.astype(dtype), lengths)
+
+        def _concat(chunks: List[np.ndarray]):
+            return np.concatenate(chunks) if chunks else np.empty(0, dtype=np.int32)
+
+        return pd.DataFrame({
+            "SKU": _sorted_categorical(_concat(self._sku_codes), self.skus),
+            "File": _sorted_categorical(_codes(batches[:, 0]), self.files),
+            "Sheet": _sorted_categorical(_codes(batches[:, 1]), self.sheets),
+            "Column": _sorted_categorical(_codes(batches[:, 2]), self.columns),
+            "RowNumber": _concat(self._rows),
+        })
+
+def _find_duplicate_skus(files: List[str], sku_cols: List[str] | None, patterns: Iterable[str] | None,
+                         jobs: int, engine: str, include_within_workbook_dupes: bool, cache=None,
+                         profiler=NULL_PROFILER, sheets: SheetFilter | None = None, pipeline: bool = False,
+                         signatures=None):
+    """Pass one of the two-pass mode: keep only per-workbook SKU sets.
+
+    Returns (duplicate SKUs, paths of the workbooks that hold them, names of all workbooks
+    with SKU data, sku_col_map, read_errors).
+    """
+    sku_ids: Dict[str, int] = {}
+    file_skus: Dict[str, np.ndarray] = {}  # basename -> sorted unique SKU codes
+    file_paths: Dict[str, List[str]] = {}
+    repeated: List[np.ndarray] = []
     sku_col_map: Dict[Tuple[str, str], List[str]] = {}
     read_errors: Dict[str, str] = {}
 
-    for fp in files:
-        try:
-            xls = pd.read_excel(fp, sheet_name=None, dtype=str, engine="openpyxl")
-        except Exception as e:
-            read_errors[fp] = f"Failed to read: {e}"
+    results = _iter_workbook_scans(files, sku_cols, patterns, jobs=jobs, engine=engine,
+                                   cache=cache, profiler=profiler, sheets=sheets, pipeline=pipeline)
+    if signatures is not None:
+        results = _sign_workbooks(results, signatures, cache)
+    for fp, scans, error in results:
+        if error:
+            read_errors[fp] = error
             continue
         basename = os.path.basename(fp)
-        for sheet_name, df in (xls or {}).items():
-            if df is None or df.empty:
-                continue
-            df.columns = [str(c).strip() for c in df.columns]
-            cols = find_sku_columns(df, explicit_cols=sku_cols, patterns=patterns)
-            if not cols:
-                continue
-            sku_col_map[(basename, sheet_name)] = cols
-            for col in cols:
-                series = df[col].map(normalize_sku)
-                for idx, sku in series.items():
-                    if sku:
-                        details_rows.append({
-                            "SKU": sku,
-                            "File": basename,
-                            "Sheet": sheet_name,
-                            "Column": col,
-                            "RowNumber": int(idx) + 2 if isinstance(idx, (int, float)) else None
-                        })
-
-    details_df = pd.DataFrame(details_rows)
-    if details_df.empty:
-        presence_counts = pd.DataFrame()
-        presence_bool = pd.DataFrame()
-        return details_df, presence_counts, presence_bool, read_errors, sku_col_map
+        for scan in scans:
+            sku_col_map[(basename, scan.sheet)] = scan.columns
+        chunks = [skus for scan in scans for _, _, skus in scan.occurrences]
+        if not chunks:
+            continue
+        local_codes, uniques = pd.factorize(np.concatenate(chunks))
+        codes = np.fromiter((_intern(sku_ids, u) for u in uniques), dtype=np.int32, count=len(uniques))
+        if include_within_workbook_dupes:
+            repeated.append(codes[np.bincount(local_codes, minlength=len(uniques)) > 1])
+        prev = file_skus.get(basename)
+        if prev is not None and include_within_workbook_dupes:
+            repeated.append(np.intersect1d(prev, codes))
+        file_skus[basename] = np.unique(codes) if prev is None else np.union1d(prev, codes)
+        file_paths.setdefault(basename, []).append(fp)
+
+    keep = np.bincount(np.concatenate(list(file_skus.values())) if file_skus else np.empty(0, dtype=np.int32),
+                       minlength=len(sku_ids)) > 1
+    for codes in repeated:
+        keep[codes] = True
+    dup_skus = np.asarray(list(sku_ids), dtype=object)[keep]
+    wanted = set(path for name, codes in file_skus.items() if keep[codes].any() for path in file_paths[name])
+    return dup_skus, [fp for fp in files if fp in wanted], list(file_skus), sku_col_map, read_errors
 
-    # Cross-workbook presence matrix
-    presence_counts = pd.crosstab(details_df["SKU"], details_df["File"])
+def _presence_frames(details_df: pd.DataFrame, sparse: bool = False):
+    """(presence_counts, presence_bool with WorkbooksCount) for a details frame.
 
+    With ``sparse`` the counts stay a PresenceMatrix and presence_bool only holds
+    the WorkbooksCount column; write_report densifies just the duplicate rows.
+    """
+    if details_df.empty:
+        return pd.DataFrame(), pd.DataFrame()
+    matrix = PresenceMatrix.from_details(details_df)
+    if sparse:
+        return matrix, matrix.workbooks_count.to_frame()
+    presence_counts = matrix.to_counts_frame()
     presence_bool = presence_counts > 0
     presence_bool["WorkbooksCount"] = presence_bool.sum(axis=1)
+    return presence_counts, presence_bool
 
-    if not include_within_workbook_dupes:
-        # We keep the matrix as-is; filtering to dupes happens when writing the report
-        pass
+def _within_workbook_dupes(presence_counts: pd.DataFrame | PresenceMatrix) -> pd.DataFrame:
+    """SKU/File/Occurrences rows for SKUs that occur more than once inside one workbook."""
+    if isinstance(presence_counts, PresenceMatrix):
+        return presence_counts.repeated_within_files()
+    if presence_counts.empty:
+        return pd.DataFrame(columns=["SKU", "File", "Occurrences"])
+    counts = presence_counts.to_numpy()
+    rows, cols = np.nonzero(counts > 1)
+    return pd.DataFrame({
+        "SKU": np.asarray(presence_counts.index, dtype=object)[rows],
+        "File": np.asarray(presence_counts.columns, dtype=object)[cols],
+        "Occurrences": counts[rows, cols],
+    })
+
+def analyze(files: List[str], sku_cols: List[str] | None = None, patterns: Iterable[str] | None = None,
+            include_within_workbook_dupes: bool = False, jobs: int = 1, engine: str = "pandas",
+            two_pass: bool = False, cache_dir: str | None = None, cache_max_bytes: int = 1 << 30,
+            sparse: bool = False, profiler: Profiler | None = None,
+            sheet_include: Iterable[str] | None = None, sheet_exclude: Iterable[str] | None = None,
+            dedupe_identical: bool = False, pipeline: bool = False, signatures=None):
+    """Core analysis. Returns (details_df, presence_counts, presence_bool_with_count, read_errors, sku_col_map).
+
+    ``jobs`` > 1 parses workbooks in that many worker processes (0 = one per CPU);
+    results are merged in input order, so the output matches a serial run.
+    ``engine="openpyxl"`` streams sheets in read-only mode and keeps only the
+    detected SKU columns instead of loading whole sheets with pd.read_excel;
+    ``engine="xml"`` gives the same results by parsing the xlsx XML directly and
+    decoding only cells in the SKU columns. The engine applies to .xlsx/.xlsm;
+    .csv, .xlsb and .ods files (and formats added with register_reader) always
+    use their own reader.
+    ``two_pass=True`` first collects only per-workbook SKU sets, then re-reads the
+    workbooks that hold duplicates and keeps details for those SKUs alone; the
+    returned frames then cover duplicated SKUs only.
+    ``cache_dir`` keeps each workbook's scan on disk keyed by its content hash and
+    the detection settings, so later runs only re-parse workbooks that changed;
+    the cache is trimmed to ``cache_max_bytes`` (least recently used first).
+    ``sparse=True`` returns presence_counts as a PresenceMatrix (CSR, no dense
+    SKU x File grid) and presence_bool with only the WorkbooksCount column.
+    ``profiler`` (a profiling.Profiler) records spans for each stage, workbook and sheet.
+    ``sheet_include`` / ``sheet_exclude`` restrict which sheets are read (globs, or
+    regexes prefixed with "re:"; see SheetFilter); other sheets are never parsed.
+    ``dedupe_identical=True`` parses each byte-identical workbook once: copies are
+    dropped before scanning (so they don't count as cross-workbook duplicates) and
+    listed in ``details_df.attrs["identical_files"]`` (first path -> copies).
+    ``pipeline=True`` overlaps reading, parsing and aggregation with a bounded
+    number of workbooks in flight; ``files`` may then be a lazy iterator (e.g.
+    discovery.iter_excel_files), unless two_pass or dedupe_identical is set.
+    ``signatures`` (a minhash.WorkbookSignatures) is filled with a MinHash
+    signature per workbook as it is scanned; with ``cache_dir`` signatures are
+    cached per workbook too. Use its similar_pairs() for approximate overlap.
+    """
+    profiler = profiler or NULL_PROFILER
+    if not pipeline or two_pass or dedupe_identical:
+        files = list(files)
+    with profiler.span("analyze", files=_count(files)) as span:
+        identical = None
+        if dedupe_identical:
+            with profiler.span("find_identical_files", rows=len(files)):
+                identical = find_identical_files(files)
+            copies = set(c for group in identical.values() for c in group)
+            files = [f for f in files if f not in copies]
+        result = _analyze(files, sku_cols, patterns, include_within_workbook_dupes, jobs, engine, two_pass,
+                          cache_dir, cache_max_bytes, sparse, profiler, _sheet_filter(sheet_include, sheet_exclude),
+                          pipeline, signatures)
+        if identical is not None:
+            result[0].attrs["identical_files"] = identical
+        span.rows = len(result[0])
+    return result
+
+def _count(files: Iterable[str]) -> int | None:
+    return len(files) if isinstance(files, list) else None
+
+def _analyze(files, sku_cols, patterns, include_within_workbook_dupes, jobs, engine, two_pass,
+             cache_dir, cache_max_bytes, sparse, profiler, sheets, pipeline=False, signatures=None):
+    """Body of analyze(), run inside its profiling span."""
+    cache = None
+    if cache_dir:
+        from .cache import ParseCache
+        cache = ParseCache(cache_dir, sku_cols=sku_cols, patterns=patterns, max_bytes=cache_max_bytes,
+                           sheets=sheets, engine=engine)
+    table = OccurrenceTable()
+    sku_col_map: Dict[Tuple[str, str], List[str]] = {}
+    read_errors: Dict[str, str] = {}
+    dup_skus = None
+
+    if two_pass:
+        with profiler.span("find_duplicate_skus"):
+            dup_skus, files, names, sku_col_map, read_errors = _find_duplicate_skus(
+                files, sku_cols, patterns, jobs, engine, include_within_workbook_dupes, cache=cache,
+                profiler=profiler, sheets=sheets, pipeline=pipeline, signatures=signatures)
+        dup_skus = set(dup_skus)
+        # keep every workbook with SKU data as a presence column, as a full run would
+        for name in names:
+            _intern(table.files, name)
+
+    with profiler.span("scan_workbooks", files=_count(files)) as span:
+        results = _iter_workbook_scans(files, sku_cols, patterns, jobs=jobs, engine=engine,
+                                       cache=cache, profiler=profiler, sheets=sheets, pipeline=pipeline)
+        if signatures is not None and not two_pass:  # pass one already signed every workbook
+            results = _sign_workbooks(results, signatures, cache)
+        _collect_scans(results, table, sku_col_map, read_errors, dup_skus)
+        span.rows = len(table)
+    if cache is not None:
+        _close_cache(cache, profiler)
+    return _finish_analysis(table, read_errors, sku_col_map, sparse, profiler)
+
+def _close_cache(cache, profiler=NULL_PROFILER):
+    """Close a ParseCache in a "cache_close" span that records this run's hits and misses."""
+    with profiler.span("cache_close", hits=cache.hits, misses=cache.misses):
+        cache.close()
+
+def _collect_scans(results: Iterable[Tuple[str, List[SheetScan], str | None]], table: OccurrenceTable,
+                   sku_col_map: Dict[Tuple[str, str], List[str]], read_errors: Dict[str, str],
+                   dup_skus: set | None = None):
+    """Add (path, scans, error) results to the occurrence table, sku_col_map and read_errors."""
+    for fp, scans, error in results:
+        if error:
+            read_errors[fp] = error
+            continue
+        basename = os.path.basename(fp)
+        for scan in scans:
+            sku_col_map[(basename, scan.sheet)] = scan.columns
+            for col, rows, skus in scan.occurrences:
+                if dup_skus is not None:
+                    keep = pd.Series(skus, dtype=object).isin(dup_skus).to_numpy()
+                    rows, skus = rows[keep], skus[keep]
+                table.add(basename, scan.sheet, col, rows, skus)
 
+def _finish_analysis(table: OccurrenceTable, read_errors: Dict[str, str],
+                     sku_col_map: Dict[Tuple[str, str], List[str]], sparse: bool = False,
+                     profiler=NULL_PROFILER):
+    """analyze()'s 5-tuple from collected occurrences."""
+    with profiler.span("build_details", rows=len(table)):
+        details_df = table.to_frame()
+    with profiler.span("presence", rows=len(details_df)):
+        presence_counts, presence_bool = _presence_frames(details_df, sparse=sparse)
     return details_df, presence_counts, presence_bool, read_errors, sku_col_map
 
+EXCEL_MAX_ROWS = 1_048_576
+_STREAM_CHUNK_ROWS = 65_536
+
+def _iter_sorted_details(details_df: pd.DataFrame, positions: np.ndarray) -> Iterator[list]:
+    """Yield [SKU, File, Sheet, Column, RowNumber] rows of ``positions`` sorted like the report.
+
+    Categorical frames (as built by analyze) are ordered with np.lexsort on the
+    category codes, so only integer arrays are held in memory.
+    """
+    cols = ["SKU", "File", "Sheet", "Column"]
+    if not all(isinstance(details_df[c].dtype, pd.CategoricalDtype) for c in cols):
+        ordered = details_df.iloc[positions].sort_values(["SKU", "File", "Sheet", "RowNumber"])
+        for start in range(0, len(ordered), _STREAM_CHUNK_ROWS):
+            yield from ordered.iloc[start:start + _STREAM_CHUNK_ROWS].values.tolist()
+        return
+    codes = [details_df[c].cat.codes.to_numpy()[positions] for c in cols]
+    row_numbers = details_df["RowNumber"].to_numpy()[positions]
+    order = np.lexsort((row_numbers, codes[2], codes[1], codes[0]))
+    categories = [np.asarray(details_df[c].cat.categories, dtype=object) for c in cols]
+    for start in range(0, len(order), _STREAM_CHUNK_ROWS):
+        take = order[start:start + _STREAM_CHUNK_ROWS]
+        columns = [cats[c[take]] for cats, c in zip(categories, codes)]
+        yield from zip(*columns, row_numbers[take].tolist())
+
+def _iter_presence_rows(frame_for: Callable[[List[str]], pd.DataFrame], skus: List[str]) -> Iterator[list]:
+    """Rows [SKU, *values] of a presence frame, densified chunk by chunk."""
+    for start in range(0, len(skus), _STREAM_CHUNK_ROWS):
+        frame = frame_for(skus[start:start + _STREAM_CHUNK_ROWS])
+        for sku, values in zip(frame.index, frame.to_numpy().tolist()):
+            yield [sku, *values]
+
+def _write_rows_streaming(workbook, sheet_name: str, header: List[str], rows: Iterable[list],
+                          max_rows: int = EXCEL_MAX_ROWS):
+    """Write ``rows`` under ``header``, continuing in <name>_2, <name>_3, ... when a sheet is full."""
+    ws, r, part = None, max_rows, 0
+    for row in rows:
+        if r >= max_rows:
+            part += 1
+            ws = workbook.add_worksheet(sheet_name if part == 1 else f"{sheet_name}_{part}")
+            ws.write_row(0, 0, header)
+            r = 1
+        ws.write_row(r, 0, row)
+        r += 1
+    if ws is None:
+        workbook.add_worksheet(sheet_name).write_row(0, 0, header)
+
+def _write_report_streaming(out_path: str, details_df: pd.DataFrame, dup_index,
+                            presence_counts, presence_bool, read_errors: Dict[str, str],
+                            sku_col_map: Dict[Tuple[str, str], List[str]], within: pd.DataFrame | None = None,
+                            identical_files: Dict[str, List[str]] | None = None,
+                            overlap: pd.DataFrame | None = None, similar: pd.DataFrame | None = None):
+    """write_report() body for constant_memory xlsxwriter output: every sheet is written row by row."""
+    import xlsxwriter
+
+    positions = np.flatnonzero(details_df["SKU"].isin(dup_index).to_numpy())
+    dup_skus = sorted(set(details_df["SKU"].iloc[positions]))
+    workbook = xlsxwriter.Workbook(out_path, {"constant_memory": True})
+    try:
+        if isinstance(presence_counts, PresenceMatrix):
+            counts_for, presence_for = presence_counts.to_counts_frame, presence_counts.to_presence_frame
+            files = list(presence_counts.files)
+        elif not presence_counts.empty:
+            counts_for = lambda skus: presence_counts.loc[skus]
+            presence_for = lambda skus: presence_bool.loc[skus]
+            files = list(presence_counts.columns)
+        else:
+            counts_for = presence_for = None
+        if counts_for is not None:
+            _write_rows_streaming(workbook, "Counts_by_File", ["SKU", *files],
+                                  _iter_presence_rows(counts_for, dup_skus))
+            _write_rows_streaming(workbook, "Presence_by_File", ["SKU", *files, "WorkbooksCount"],
+                                  _iter_presence_rows(presence_for, dup_skus))
+        _write_rows_streaming(workbook, "Details", ["SKU", "File", "Sheet", "Column", "RowNumber"],
+                              _iter_sorted_details(details_df, positions))
+        if within is not None:
+            _write_rows_streaming(workbook, "Within_Workbook_Dupes", ["SKU", "File", "Occurrences"],
+                                  zip(within["SKU"].tolist(), within["File"].tolist(),
+                                      within["Occurrences"].tolist()))
+        if overlap is not None:
+            _write_rows_streaming(workbook, "Workbook_Overlap", list(overlap.columns),
+                                  overlap.itertuples(index=False, name=None))
+        if similar is not None:
+            _write_rows_streaming(workbook, "Similar_Workbooks", list(similar.columns),
+                                  similar.itertuples(index=False, name=None))
+        _write_rows_streaming(workbook, "Detected_Columns", ["File", "Sheet", "Detected_SKU_Columns"],
+                              ([k[0], k[1], ", ".join(v)] for k, v in sku_col_map.items()))
+        if identical_files:
+            _write_rows_streaming(workbook, "Identical_Files", _IDENTICAL_FILES_HEADER,
+                                  _identical_files_rows(identical_files))
+        if read_errors:
+            _write_rows_streaming(workbook, "Read_Issues", ["File", "Issue"],
+                                  ([os.path.basename(k), v] for k, v in read_errors.items()))
+    finally:
+        workbook.close()
+
+def workbook_overlap(details_df: pd.DataFrame, presence_counts: pd.DataFrame | PresenceMatrix | None = None,
+                     min_shared: int = 1) -> pd.DataFrame:
+    """File_A/File_B/Shared_SKUs/SKUs_A/SKUs_B/Jaccard/Containment for analyze() results.
+
+    Uses ``presence_counts`` when it is a PresenceMatrix (sparse=True), else builds
+    one from ``details_df``; see PresenceMatrix.workbook_overlap. Needs full
+    per-workbook SKU sets, so not two_pass results.
+    """
+    if isinstance(presence_counts, PresenceMatrix):
+        matrix = presence_counts
+    else:
+        matrix = PresenceMatrix.from_details(details_df)
+    return matrix.workbook_overlap(min_shared=min_shared)
+
+def _identical_files_rows(identical_files: Dict[str, List[str]]) -> List[list]:
+    return [[os.path.basename(first), os.path.basename(copy), copy]
+            for first, copies in identical_files.items() for copy in copies]
+
+_IDENTICAL_FILES_HEADER = ["File", "Identical_Copy", "Copy_Path"]
+
 def write_report(out_path: str,
                  details_df: pd.DataFrame,
-                 presence_counts: pd.DataFrame,
+                 presence_counts: pd.DataFrame | PresenceMatrix,
                  presence_bool: pd.DataFrame,
                  read_errors: Dict[str, str],
                  sku_col_map: Dict[Tuple[str, str], List[str]],
-                 only_across_workbooks: bool = True):
+                 only_across_workbooks: bool = True,
+                 streaming: bool = False,
+                 identical_files: Dict[str, List[str]] | None = None,
+                 overlap: bool = False,
+                 similar_workbooks: pd.DataFrame | None = None):
+    """Write the Excel report.
+
+    With ``only_across_workbooks=False`` the report also covers SKUs repeated
+    inside a single workbook (across its sheets and columns) and lists them,
+    with their occurrence counts, on a Within_Workbook_Dupes sheet.
+    ``identical_files`` (default: ``details_df.attrs["identical_files"]`` as set by
+    analyze(dedupe_identical=True)) adds an Identical_Files sheet listing the
+    byte-identical copies that were skipped.
+    ``streaming=True`` uses xlsxwriter's constant_memory mode, writes Details rows
+    in sorted order straight from the occurrence codes and continues in
+    Details_2, Details_3, ... past Excel's 1,048,576-row limit. It is also used
+    automatically when the duplicate details would not fit in one sheet.
+    ``overlap=True`` adds a Workbook_Overlap sheet (see workbook_overlap()) with
+    shared-SKU counts and Jaccard similarity for every pair of workbooks that
+    share a SKU, most similar first (cut at Excel's row limit).
+    ``similar_workbooks`` (e.g. WorkbookSignatures.similar_pairs()) is written
+    as a Similar_Workbooks sheet; unlike ``overlap`` it also works for two_pass runs.
+    """
     os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+    if identical_files is None:
+        identical_files = details_df.attrs.get("identical_files")
+    identical_df = None
+    if identical_files:
+        identical_df = pd.DataFrame(_identical_files_rows(identical_files), columns=_IDENTICAL_FILES_HEADER)
 
     if details_df.empty:
         with pd.ExcelWriter(out_path, engine="xlsxwriter") as writer:
             pd.DataFrame([{"Message": "No SKU-like data found in the provided files."}]).to_excel(writer, sheet_name="Summary", index=False)
+            if identical_df is not None:
+                identical_df.to_excel(writer, sheet_name="Identical_Files", index=False)
             if read_errors:
                 pd.DataFrame([{"File": os.path.basename(k), "Issue": v} for k, v in read_errors.items()]).to_excel(writer, sheet_name="Read_Issues", index=False)
         return
 
     # Determine dup SKUs
+    within = None if only_across_workbooks else _within_workbook_dupes(presence_counts)
     if "WorkbooksCount" in presence_bool.columns:
-        if only_across_workbooks:
-            dup_index = presence_bool.index[presence_bool["WorkbooksCount"] > 1]
-        else:
-            # Any duplicated SKU anywhere (across or within) – treat WorkbooksCount>=1 and check within-file dupes separately if needed
-            dup_index = presence_bool.index
+        dup_index = presence_bool.index[presence_bool["WorkbooksCount"] > 1]
+        if within is not None:
+            dup_index = dup_index.union(pd.Index(within["SKU"].unique(), dtype=object))
     else:
         dup_index = presence_bool.index
+    overlap_df = workbook_overlap(details_df, presence_counts).head(EXCEL_MAX_ROWS - 1) if overlap else None
+    similar_df = similar_workbooks.head(EXCEL_MAX_ROWS - 1) if similar_workbooks is not None else None
+
+    if streaming or len(details_df) >= EXCEL_MAX_ROWS:
+        dup_mask = details_df["SKU"].isin(dup_index)
+        if streaming or dup_mask.sum() >= EXCEL_MAX_ROWS:
+            _write_report_streaming(out_path, details_df, dup_index, presence_counts, presence_bool,
+                                    read_errors, sku_col_map, within, identical_files, overlap_df, similar_df)
+            return
 
     details_dups = details_df[details_df["SKU"].isin(dup_index)].sort_values(["SKU", "File", "Sheet", "RowNumber"])
 
+    dup_skus = sorted(set(details_dups["SKU"]))
+    if isinstance(presence_counts, PresenceMatrix):
+        # sparse analyze() output: densify only the duplicate rows
+        counts_frame = presence_counts.to_counts_frame(dup_skus)
+        presence_frame = presence_counts.to_presence_frame(dup_skus)
+    elif not presence_counts.empty:
+        counts_frame = presence_counts.loc[dup_skus]
+        presence_frame = presence_bool.loc[dup_skus]
+    else:
+        counts_frame = presence_frame = None
+
     with pd.ExcelWriter(out_path, engine="xlsxwriter") as writer:
-        if not presence_counts.empty:
-            presence_counts.loc[sorted(set(details_dups["SKU"]))].to_excel(writer, sheet_name="Counts_by_File")
-            presence_bool.loc[sorted(set(details_dups["SKU"]))].to_excel(writer, sheet_name="Presence_by_File")
+        if counts_frame is not None:
+            counts_frame.to_excel(writer, sheet_name="Counts_by_File")
+            presence_frame.to_excel(writer, sheet_name="Presence_by_File")
         details_dups.to_excel(writer, sheet_name="Details", index=False)
+        if within is not None:
+            within.to_excel(writer, sheet_name="Within_Workbook_Dupes", index=False)
+        if overlap_df is not None:
+            overlap_df.to_excel(writer, sheet_name="Workbook_Overlap", index=False)
+        if similar_df is not None:
+            similar_df.to_excel(writer, sheet_name="Similar_Workbooks", index=False)
 
         sku_map_records = [{
             "File": k[0],
@@ -180,6 +1439,8 @@ def write_report(out_path: str,
             "Detected_SKU_Columns": ", ".join(v)
         } for k, v in sku_col_map.items()]
         pd.DataFrame(sku_map_records).to_excel(writer, sheet_name="Detected_Columns", index=False)
+        if identical_df is not None:
+            identical_df.to_excel(writer, sheet_name="Identical_Files", index=False)
 
         if read_errors:
             pd.DataFrame([{"File": os.path.basename(k), "Issue": v} for k, v in read_errors.items()]).to_excel(writer, sheet_name="Read_Issues", index=False)
@@ -0,0 +1,217 @@
+from __future__ import annotations
+import os
+from typing import Dict, Iterable, List, NamedTuple, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .cache import ParseCache, _occurrence_count, _sheet_headers, decode_payload, encode_payload, settings_fingerprint
+from .core import NULL_PROFILER, SheetScan, _iter_workbook_scans, _scan_rows, _sheet_filter, _close_cache
+from .discovery import file_digest
+
+STATE_FORMAT = 1
+_MAGIC = b"SKUDUPE-STATE\x00"
+
+class WorkbookSkus(NamedTuple):
+    """Unique normalized SKUs of one workbook and the file version they were read from."""
+    size: int
+    mtime_ns: int
+    digest: str
+    skus: np.ndarray  # sorted, object dtype
+
+class RunState:
+    """Per-workbook SKU sets saved by a delta run; the baseline for the next one."""
+
+    def __init__(self, settings: str, workbooks: Dict[str, WorkbookSkus] | None = None):
+        self.settings = settings
+        self.workbooks = dict(workbooks or {})  # absolute path -> WorkbookSkus
+
+    def to_bytes(self) -> bytes:
+        # each SKU set is stored as a one-column scan, sharing the cache's SKU dictionary encoding
+        scans = [SheetScan("", [], [("", np.zeros(len(wb.skus), dtype=np.int32), wb.skus)])
+                 for wb in self.workbooks.values()]
+        header = {
+            "format": STATE_FORMAT,
+            "settings": self.settings,
+            "workbooks": [{"path": path, "size": wb.size, "mtime_ns": wb.mtime_ns, "digest": wb.digest,
+                           "sheets": _sheet_headers([scan])}
+                          for (path, wb), scan in zip(self.workbooks.items(), scans)],
+        }
+        return encode_payload(_MAGIC, header, scans)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "RunState":
+        header, arrays = decode_payload(
+            _MAGIC, data, lambda h: sum(_occurrence_count(wb["sheets"]) for wb in h["workbooks"]))
+        if header.get("format") != STATE_FORMAT:
+            raise ValueError(f"unsupported state format {header.get('format')!r}")
+        workbooks = {}
+        for wb in header["workbooks"]:
+            skus = arrays.take(wb["sheets"])[0].occurrences[0][2]
+            workbooks[wb["path"]] = WorkbookSkus(wb["size"], wb["mtime_ns"], wb["digest"], skus)
+        return cls(header["settings"], workbooks)
+
+    def save(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(self.to_bytes())
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str) -> "RunState":
+        with open(path, "rb") as f:
+            return cls.from_bytes(f.read())
+
+class Delta(NamedTuple):
+    """What changed between two runs; SKU tables are sorted by SKU."""
+    newly_duplicated: pd.DataFrame  # SKU, WorkbooksCount, Workbooks, Previous_Workbooks
+    resolved: pd.DataFrame          # SKU, WorkbooksCount, Workbooks, Previous_Workbooks
+    changed: pd.DataFrame           # SKU, WorkbooksCount, Added_Workbooks, Removed_Workbooks, Workbooks
+    workbooks: pd.DataFrame         # File, Path, Status (added/removed/changed/unchanged/unreadable)
+    read_errors: Dict[str, str]
+    has_baseline: bool
+
+def _unique_skus(scans: List[SheetScan]) -> np.ndarray:
+    chunks = [skus for scan in scans for _, _, skus in scan.occurrences]
+    if not chunks:
+        return np.empty(0, dtype=object)
+    return np.sort(pd.unique(np.concatenate(chunks).astype(object))).astype(object)
+
+def _file_sets(workbooks: Dict[str, WorkbookSkus], candidates: pd.Index) -> Dict[str, frozenset]:
+    """SKU -> names of the workbooks (basenames, as in the report) holding it, for ``candidates`` only."""
+    found: Dict[str, set] = {}
+    for path, wb in workbooks.items():
+        name = os.path.basename(path)
+        for sku in wb.skus[candidates.get_indexer(wb.skus) >= 0]:
+            found.setdefault(sku, set()).add(name)
+    return {sku: frozenset(names) for sku, names in found.items()}
+
+def _join(names: Iterable[str]) -> str:
+    return ", ".join(sorted(names))
+
+def analyze_delta(files: List[str], state: RunState | None = None, sku_cols: List[str] | None = None,
+                  patterns: Iterable[str] | None = None, jobs: int = 1, engine: str = "pandas",
+                  cache_dir: str | None = None, cache_max_bytes: int = 1 << 30,
+                  sheet_include: Iterable[str] | None = None, sheet_exclude: Iterable[str] | None = None,
+                  profiler=NULL_PROFILER, pipeline: bool = False) -> Tuple[Delta, RunState]:
+    """Compare ``files`` with the run saved in ``state``; returns (delta, new state to save).
+
+    Workbooks whose size and mtime (or, failing that, content hash) match the
+    state reuse its SKU set and are not parsed. Only SKUs in the symmetric
+    difference of a changed, added or removed workbook can change status, so
+    only those are compared. A workbook that can't be read keeps its previous
+    SKU set (and is listed in read_errors) rather than counting as removed.
+    With no ``state`` (or one saved with other column/sheet settings) every
+    workbook is parsed; without a baseline every duplicate is "newly duplicated".
+    Workbooks are keyed by absolute path, so runs from other working directories
+    (or with the folder given another way) still line up.
+    """
+    sheets = _sheet_filter(sheet_include, sheet_exclude)
+    settings = settings_fingerprint(sku_cols, patterns, sheets)
+    has_baseline = state is not None
+    old = state.workbooks if state is not None else {}
+    reusable = old if state is not None and state.settings == settings else {}
+
+    new: Dict[str, WorkbookSkus] = {}
+    status: Dict[str, str] = {}
+    to_parse: List[str] = []
+    with profiler.span("check_workbooks", rows=len(files)):
+        for fp in dict.fromkeys(os.path.abspath(f) for f in files):  # keyed like ParseCache's path index
+            prev = reusable.get(fp)
+            try:
+                st = os.stat(fp)
+                if prev is not None and (prev.size != st.st_size or prev.mtime_ns != st.st_mtime_ns):
+                    if file_digest(fp) == prev.digest:  # touched, not changed
+                        prev = prev._replace(size=st.st_size, mtime_ns=st.st_mtime_ns)
+                    else:
+                        prev = None
+            except OSError:
+                prev = None
+            if prev is not None:
+                new[fp] = prev
+                status[fp] = "unchanged"
+            else:
+                to_parse.append(fp)
+
+    cache = None
+    if cache_dir:
+        cache = ParseCache(cache_dir, sku_cols=sku_cols, patterns=patterns, max_bytes=cache_max_bytes,
+                           sheets=sheets, engine=engine)
+    read_errors: Dict[str, str] = {}
+    with profiler.span("scan_workbooks", files=len(to_parse)) as span:
+        rows = 0
+        for fp, scans, error in _iter_workbook_scans(to_parse, sku_cols, patterns, jobs=jobs, engine=engine,
+                                                     cache=cache, profiler=profiler, sheets=sheets,
+                                                     pipeline=pipeline):
+            if error:
+                read_errors[fp] = error
+                status[fp] = "unreadable"
+                if fp in old:
+                    new[fp] = old[fp]
+                continue
+            try:
+                st = os.stat(fp)
+                new[fp] = WorkbookSkus(st.st_size, st.st_mtime_ns, file_digest(fp), _unique_skus(scans))
+            except OSError as e:
+                read_errors[fp] = f"Failed to read: {e}"
+                status[fp] = "unreadable"
+                continue
+            status[fp] = "changed" if fp in old else "added"
+            rows += _scan_rows(scans)
+        span.rows = rows
+    if cache is not None:
+        _close_cache(cache, profiler)
+    for fp in old:
+        if fp not in status:
+            status[fp] = "removed"
+
+    with profiler.span("compare"):
+        touched = [fp for fp, s in status.items() if s in ("added", "removed", "changed")]
+        diffs = [np.setxor1d(old[fp].skus if fp in old else np.empty(0, dtype=object),
+                             new[fp].skus if fp in new else np.empty(0, dtype=object)) for fp in touched]
+        candidates = pd.Index(np.unique(np.concatenate(diffs)) if diffs else np.empty(0, dtype=object))
+        before = _file_sets(old, candidates)
+        after = _file_sets(new, candidates)
+        newly, resolved, changed = [], [], []
+        for sku in candidates:
+            was, now = before.get(sku, frozenset()), after.get(sku, frozenset())
+            if len(was) <= 1 < len(now):
+                newly.append([sku, len(now), _join(now), _join(was)])
+            elif len(now) <= 1 < len(was):
+                resolved.append([sku, len(now), _join(now), _join(was)])
+            elif len(now) > 1 and now != was:
+                changed.append([sku, len(now), _join(now - was), _join(was - now), _join(now)])
+
+    status_cols = ["SKU", "WorkbooksCount", "Workbooks", "Previous_Workbooks"]
+    delta = Delta(
+        newly_duplicated=pd.DataFrame(newly, columns=status_cols),
+        resolved=pd.DataFrame(resolved, columns=status_cols),
+        changed=pd.DataFrame(changed, columns=["SKU", "WorkbooksCount", "Added_Workbooks", "Removed_Workbooks",
+                                               "Workbooks"]),
+        workbooks=pd.DataFrame([[os.path.basename(fp), fp, s] for fp, s in status.items()],
+                               columns=["File", "Path", "Status"]),
+        read_errors=read_errors,
+        has_baseline=has_baseline,
+    )
+    return delta, RunState(settings, new)
+
+def write_delta_report(out_path: str, delta: Delta):
+    """Excel delta report: Summary, Newly_Duplicated, Resolved, Workbooks_Changed, Workbooks (+ Read_Issues)."""
+    os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+    counts = delta.workbooks["Status"].value_counts()
+    summary = [
+        ["Previous run", "yes" if delta.has_baseline else "none (this run is the baseline)"],
+        ["Newly duplicated SKUs", len(delta.newly_duplicated)],
+        ["Resolved duplicates", len(delta.resolved)],
+        ["Duplicates that gained/lost workbooks", len(delta.changed)],
+    ] + [[f"Workbooks {s}", int(counts.get(s, 0))] for s in ("added", "changed", "removed", "unchanged", "unreadable")]
+    with pd.ExcelWriter(out_path, engine="xlsxwriter") as writer:
+        pd.DataFrame(summary, columns=["Item", "Value"]).to_excel(writer, sheet_name="Summary", index=False)
+        delta.newly_duplicated.to_excel(writer, sheet_name="Newly_Duplicated", index=False)
+        delta.resolved.to_excel(writer, sheet_name="Resolved", index=False)
+        delta.changed.to_excel(writer, sheet_name="Workbooks_Changed", index=False)
+        delta.workbooks.to_excel(writer, sheet_name="Workbooks", index=False)
+        if delta.read_errors:
+            pd.DataFrame([{"File": os.path.basename(k), "Issue": v} for k, v in delta.read_errors.items()]
+                         ).to_excel(writer, sheet_name="Read_Issues", index=False)
@@ -0,0 +1,188 @@
+from __future__ import annotations
+import fnmatch
+import hashlib
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, Iterable, Iterator, List, Tuple
+
+# Kept free of pandas/openpyxl imports: the CLI uses it before deciding to analyze anything.
+
+# Extensions picked up in folders; core.register_reader() appends to it.
+WORKBOOK_EXTENSIONS = [".xlsx", ".xlsm", ".xlsb", ".ods", ".csv"]
+_DISCOVERY_THREADS = 8
+
+def _to_timestamp(value) -> float | None:
+    """Epoch seconds from None, a number, a datetime/date or an ISO date string."""
+    if value is None or isinstance(value, (int, float)):
+        return value
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if not isinstance(value, datetime):  # a date
+        value = datetime(value.year, value.month, value.day)
+    return value.timestamp()
+
+class _FileFilter:
+    """Name/path/mtime checks shared by directory entries and explicit file inputs."""
+
+    def __init__(self, extensions, include, exclude, skip_lock_files, modified_after, modified_before):
+        self.extensions = tuple(e.lower() for e in extensions)
+        self.include = [p.lower() for p in include or []]
+        self.exclude = [p.lower() for p in exclude or []]
+        self.skip_lock_files = skip_lock_files
+        self.after = _to_timestamp(modified_after)
+        self.before = _to_timestamp(modified_before)
+
+    @staticmethod
+    def _matches(patterns: List[str], name: str, relpath: str) -> bool:
+        # 'x*.xlsx' looks at the name only, 'archive/*' at the path below the input directory
+        name, relpath = name.lower(), relpath.lower()
+        return any(fnmatch.fnmatchcase(relpath if "/" in p else name, p) for p in patterns)
+
+    def excluded(self, name: str, relpath: str) -> bool:
+        return bool(self.exclude) and self._matches(self.exclude, name, relpath)
+
+    def wanted(self, name: str, relpath: str, stat: Callable[[], os.stat_result]) -> bool:
+        lname = name.lower()
+        if not lname.endswith(self.extensions):
+            return False
+        if self.skip_lock_files and name.startswith("~$"):
+            return False  # Excel's owner/lock file next to an open workbook
+        if self.include and not self._matches(self.include, name, relpath):
+            return False
+        if self.excluded(name, relpath):
+            return False
+        if self.after is not None or self.before is not None:
+            try:
+                mtime = stat().st_mtime
+            except OSError:
+                return False
+            if (self.after is not None and mtime < self.after) or (self.before is not None and mtime >= self.before):
+                return False
+        return True
+
+def _list_dir(path: str) -> Tuple[List[os.DirEntry], List[os.DirEntry]]:
+    """(file entries, subdirectory entries) of ``path``; unreadable directories are empty, like os.walk."""
+    files, dirs = [], []
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+                if not is_dir:
+                    files.append(entry)
+                elif not entry.is_symlink():  # os.walk doesn't follow directory links either
+                    dirs.append(entry)
+    except OSError:
+        pass
+    return files, dirs
+
+def iter_excel_files(inputs: Iterable[str], recursive: bool = False, include: Iterable[str] | None = None,
+                     exclude: Iterable[str] | None = None, max_depth: int | None = None,
+                     skip_lock_files: bool = True, modified_after=None, modified_before=None,
+                     extensions: Iterable[str] | None = None,
+                     threads: int = _DISCOVERY_THREADS) -> Iterator[str]:
+    """Yield workbook paths under ``inputs`` (files or directories) as they are found.
+
+    Directories are listed with os.scandir; with ``recursive``, subdirectories
+    are listed ahead of time by a pool of ``threads`` threads while earlier
+    results are already being yielded, in the same order os.walk would give.
+    ``include`` / ``exclude`` are case-insensitive globs matched against the file
+    name, or against the path relative to the input directory when they contain
+    a '/' (excluded directories are not entered). ``max_depth`` limits recursion (0 = the input directory only).
+    Excel lock files (``~$name.xlsx``) are skipped unless ``skip_lock_files=False``.
+    ``modified_after`` / ``modified_before`` (epoch seconds, datetime or ISO date)
+    keep files whose mtime is in [after, before). ``extensions`` defaults to
+    WORKBOOK_EXTENSIONS.
+    """
+    flt = _FileFilter(WORKBOOK_EXTENSIONS if extensions is None else extensions, include, exclude, skip_lock_files, modified_after, modified_before)
+    if not recursive:
+        max_depth = 0
+    seen = set()
+    pool = ThreadPoolExecutor(max_workers=max(threads, 1)) if max_depth != 0 else None
+
+    def _walk(root: str, listing, depth: int) -> Iterator[str]:
+        files, dirs = listing.result() if pool is not None else listing
+        for entry in files:
+            rel = os.path.relpath(entry.path, root).replace(os.sep, "/")
+            if flt.wanted(entry.name, rel, entry.stat):
+                yield entry.path
+        if max_depth is not None and depth >= max_depth:
+            return
+        subdirs = [d for d in dirs if not flt.excluded(d.name, os.path.relpath(d.path, root).replace(os.sep, "/"))]
+        # list all children in the background, then descend in order
+        pending = [(d.path, pool.submit(_list_dir, d.path)) for d in subdirs]
+        for _, fut in pending:
+            yield from _walk(root, fut, depth + 1)
+
+    try:
+        for p in inputs:
+            if os.path.isdir(p):
+                listing = pool.submit(_list_dir, p) if pool is not None else _list_dir(p)
+                found = _walk(p, listing, 0)
+            elif os.path.isfile(p) and flt.wanted(os.path.basename(p), os.path.basename(p), lambda: os.stat(p)):
+                found = [p]
+            else:
+                continue
+            for f in found:
+                if f not in seen:
+                    seen.add(f)
+                    yield f
+    finally:
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+def find_excel_files(inputs: List[str], recursive: bool = False, **filters) -> List[str]:
+    """List of iter_excel_files(); ``filters`` are its keyword options."""
+    return list(iter_excel_files(inputs, recursive=recursive, **filters))
+
+def file_digest(path: str, chunk_size: int = 1 << 20) -> str:
+    """Content hash of a file (hex blake2b-128)."""
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def _partial_digest(path: str, size: int, block: int = 1 << 16) -> str:
+    """Hash of the first and last ``block`` bytes; for xlsx the tail holds the zip directory with every CRC."""
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        h.update(f.read(block))
+        if size > 2 * block:
+            f.seek(-block, os.SEEK_END)
+        h.update(f.read(block))
+    return h.hexdigest()
+
+def _group_by(paths: List[str], key) -> List[List[str]]:
+    groups: Dict[object, List[str]] = {}
+    for p in paths:
+        try:
+            k = key(p)
+        except OSError:
+            continue
+        groups.setdefault(k, []).append(p)
+    return [g for g in groups.values() if len(g) > 1]
+
+def find_identical_files(files: List[str]) -> Dict[str, List[str]]:
+    """Byte-identical copies among ``files``: first path of each group -> the other paths.
+
+    Files are grouped by size first, then by a hash of their first and last
+    64 KiB, and only the remaining candidates are hashed in full, so unique
+    files are usually never read beyond two small blocks.
+    """
+    sizes = {}
+    for f in files:
+        try:
+            sizes[f] = os.path.getsize(f)
+        except OSError:
+            pass
+    identical: Dict[str, List[str]] = {}
+    for same_size in _group_by(list(sizes), sizes.__getitem__):
+        for candidates in _group_by(same_size, lambda p: _partial_digest(p, sizes[p])):
+            for group in _group_by(candidates, file_digest):
+                identical[group[0]] = group[1:]
+    order = {f: i for i, f in enumerate(files)}
+    return dict(sorted(identical.items(), key=lambda kv: order[kv[0]]))
@@ -0,0 +1,100 @@
+from __future__ import annotations
+import os
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .core import _IDENTICAL_FILES_HEADER, _identical_files_rows
+from .presence import PresenceMatrix
+
+EXPORT_FORMATS = ("xlsx", "parquet", "arrow", "csv")
+_EXTENSIONS = {"parquet": ".parquet", "arrow": ".arrow", "csv": ".csv"}
+
+def _require_pyarrow():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        raise ImportError("Parquet and Arrow export need pyarrow: pip install 'sku-dupe-finder[arrow]' "
+                          "(or pip install pyarrow), or use --format csv.") from None
+
+def result_tables(details_df: pd.DataFrame, presence_counts: pd.DataFrame | PresenceMatrix,
+                  read_errors: Dict[str, str], sku_col_map: Dict[Tuple[str, str], List[str]],
+                  identical_files: Dict[str, List[str]] | None = None) -> Dict[str, pd.DataFrame]:
+    """analyze() results as flat tables, keyed by table name.
+
+    details: SKU/File/Sheet/Column/RowNumber (all occurrences, categoricals kept).
+    presence: SKU/File/Count, one row per non-zero cell of the presence matrix.
+    skus: SKU/WorkbooksCount/Occurrences per SKU.
+    detected_columns, read_issues and (if any) identical_files as in the report.
+    """
+    if isinstance(presence_counts, PresenceMatrix):
+        matrix = presence_counts
+    elif details_df.empty:
+        matrix = PresenceMatrix.from_codes(np.empty(0, dtype=np.int32), np.empty(0, dtype=np.int32), [], [])
+    else:
+        matrix = PresenceMatrix.from_details(details_df.astype({"SKU": "category", "File": "category"}))
+    presence = matrix.to_long_frame()
+    occurrences = np.bincount(presence["SKU"].cat.codes.to_numpy(), weights=matrix.counts,
+                              minlength=len(matrix.skus)).astype(np.int64)
+    tables = {
+        "details": details_df if not details_df.empty else pd.DataFrame(
+            columns=["SKU", "File", "Sheet", "Column", "RowNumber"]),
+        "presence": presence,
+        "skus": pd.DataFrame({
+            "SKU": np.asarray(matrix.skus, dtype=object),
+            "WorkbooksCount": np.diff(matrix.indptr),
+            "Occurrences": occurrences,
+        }),
+        "detected_columns": pd.DataFrame(
+            [[k[0], k[1], ", ".join(v)] for k, v in sku_col_map.items()],
+            columns=["File", "Sheet", "Detected_SKU_Columns"]),
+        "read_issues": pd.DataFrame([[os.path.basename(k), v] for k, v in read_errors.items()],
+                                    columns=["File", "Issue"]),
+    }
+    if identical_files:
+        tables["identical_files"] = pd.DataFrame(_identical_files_rows(identical_files),
+                                                 columns=_IDENTICAL_FILES_HEADER)
+    return tables
+
+def _write_table(df: pd.DataFrame, path: str, fmt: str):
+    if fmt == "csv":
+        df.to_csv(path, index=False)
+        return
+    import pyarrow as pa
+
+    # pandas categoricals become dictionary-encoded columns
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+        pq.write_table(table, path, compression="zstd")
+    else:
+        import pyarrow.feather as feather
+        feather.write_feather(table, path, compression="lz4")
+
+def export_tables(stem: str, details_df: pd.DataFrame, presence_counts: pd.DataFrame | PresenceMatrix,
+                  read_errors: Dict[str, str], sku_col_map: Dict[Tuple[str, str], List[str]],
+                  formats: Iterable[str] = ("parquet",),
+                  identical_files: Dict[str, List[str]] | None = None) -> List[str]:
+    """Write result_tables() as ``<stem>.<table>.<parquet|arrow|csv>`` for each format; returns the paths.
+
+    Arrow files are Arrow IPC (Feather v2) files. Parquet and Arrow need pyarrow.
+    ``identical_files`` defaults to ``details_df.attrs["identical_files"]``.
+    """
+    formats = [f for f in dict.fromkeys(formats) if f != "xlsx"]
+    unknown = [f for f in formats if f not in _EXTENSIONS]
+    if unknown:
+        raise ValueError(f"Unknown export format(s) {unknown}; expected some of {list(EXPORT_FORMATS)}")
+    if any(f in ("parquet", "arrow") for f in formats):
+        _require_pyarrow()
+    if identical_files is None:
+        identical_files = details_df.attrs.get("identical_files")
+    os.makedirs(os.path.dirname(stem) or ".", exist_ok=True)
+    tables = result_tables(details_df, presence_counts, read_errors, sku_col_map, identical_files)
+    paths = []
+    for fmt in formats:
+        for name, df in tables.items():
+            path = f"{stem}.{name}{_EXTENSIONS[fmt]}"
+            _write_table(df, path, fmt)
+            paths.append(path)
+    return paths
@@ -0,0 +1,110 @@
+from __future__ import annotations
+import os
+import sqlite3
+import time
+from typing import Iterable, List, NamedTuple, Tuple
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS workbooks (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    indexed_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS postings (
+    sku TEXT NOT NULL,
+    workbook_id INTEGER NOT NULL,
+    sheet TEXT NOT NULL,
+    col TEXT NOT NULL,
+    row INTEGER NOT NULL,
+    PRIMARY KEY (sku, workbook_id, sheet, col, row)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS postings_by_workbook ON postings (workbook_id);
+"""
+
+class Posting(NamedTuple):
+    """One occurrence of a SKU, as in the report's Details sheet."""
+    sku: str
+    file: str
+    sheet: str
+    column: str
+    row: int
+
+class SkuIndex:
+    """Persistent SKU -> occurrences index in a SQLite file.
+
+    Postings are clustered by SKU (a WITHOUT ROWID table keyed on it), so a
+    lookup is a single B-tree range scan. Each workbook's postings are replaced
+    as a unit, so re-indexing a run only rewrites the workbooks it scanned.
+    """
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self._conn = sqlite3.connect(path)
+        self._conn.executescript(_SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._conn.close()
+
+    def _workbook_id(self, name: str) -> int:
+        self._conn.execute("INSERT INTO workbooks (name, indexed_at) VALUES (?, ?) "
+                           "ON CONFLICT(name) DO UPDATE SET indexed_at = excluded.indexed_at", (name, time.time()))
+        return self._conn.execute("SELECT id FROM workbooks WHERE name = ?", (name,)).fetchone()[0]
+
+    def update_workbook(self, name: str, occurrences: Iterable[Tuple[str, str, str, int]]):
+        """Replace the postings of workbook ``name`` with (sku, sheet, column, row) tuples."""
+        with self._conn:
+            wid = self._workbook_id(name)
+            self._conn.execute("DELETE FROM postings WHERE workbook_id = ?", (wid,))
+            self._conn.executemany("INSERT OR IGNORE INTO postings VALUES (?, ?, ?, ?, ?)",
+                                   ((sku, wid, sheet, col, int(row)) for sku, sheet, col, row in occurrences))
+
+    def remove_workbook(self, name: str):
+        with self._conn:
+            row = self._conn.execute("SELECT id FROM workbooks WHERE name = ?", (name,)).fetchone()
+            if row:
+                self._conn.execute("DELETE FROM postings WHERE workbook_id = ?", (row[0],))
+                self._conn.execute("DELETE FROM workbooks WHERE id = ?", (row[0],))
+
+    def update_from_details(self, details_df, workbooks: Iterable[str] | None = None):
+        """Re-index every workbook in ``details_df`` (SKU/File/Sheet/Column/RowNumber).
+
+        ``workbooks`` lists all workbook names that were scanned; those without
+        any SKU rows in ``details_df`` are emptied, so stale postings disappear.
+        """
+        names = list(dict.fromkeys(workbooks or []))
+        if not details_df.empty:
+            for name, group in details_df.groupby("File", observed=True, sort=False):
+                # inserting in key order keeps B-tree page splits local
+                group = group.sort_values(["SKU", "Sheet", "Column", "RowNumber"])
+                self.update_workbook(name, zip(group["SKU"].astype(object), group["Sheet"].astype(object),
+                                               group["Column"].astype(object), group["RowNumber"].tolist()))
+            present = set(details_df["File"].unique())
+            names = [n for n in names if n not in present]
+        for name in names:
+            self.update_workbook(name, ())
+
+    def lookup(self, sku: str, normalize: bool = True) -> List[Posting]:
+        """All occurrences of ``sku`` (normalized like the report unless ``normalize=False``)."""
+        if normalize:
+            from .core import normalize_sku
+            sku = normalize_sku(sku)
+            if sku is None:
+                return []
+        rows = self._conn.execute(
+            "SELECT p.sku, w.name, p.sheet, p.col, p.row FROM postings p JOIN workbooks w ON w.id = p.workbook_id "
+            "WHERE p.sku = ? ORDER BY w.name, p.sheet, p.row", (sku,)).fetchall()
+        return [Posting(*r) for r in rows]
+
+    def workbooks_for(self, sku: str, normalize: bool = True) -> List[str]:
+        """Names of the workbooks containing ``sku``."""
+        return list(dict.fromkeys(p.file for p in self.lookup(sku, normalize=normalize)))
+
+    def workbooks(self) -> List[str]:
+        return [r[0] for r in self._conn.execute("SELECT name FROM workbooks ORDER BY name")]
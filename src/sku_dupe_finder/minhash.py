@@ -0,0 +1,124 @@
+from __future__ import annotations
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+NUM_PERM = 128
+_HASH_CHUNK = 4096  # SKUs hashed per step: keeps the (chunk x num_perm) uint64 scratch at 4 MB
+_EMPTY = np.iinfo(np.uint32).max
+
+def _lsh_params(num_perm: int, threshold: float) -> Tuple[int, int]:
+    """(bands, rows) with bands * rows == num_perm whose S-curve midpoint (1/b)^(1/r) is closest to ``threshold``."""
+    options = [(b, num_perm // b) for b in range(1, num_perm + 1) if num_perm % b == 0]
+    return min(options, key=lambda br: abs((1 / br[0]) ** (1 / br[1]) - threshold))
+
+def _group_pairs(groups: np.ndarray) -> np.ndarray:
+    """Keys ``i * n + j`` (i < j) for every pair of positions that share a group id."""
+    n = len(groups)
+    order = np.lexsort((np.arange(n), groups))
+    sorted_groups = groups[order]
+    starts = np.flatnonzero(np.r_[True, sorted_groups[1:] != sorted_groups[:-1]])
+    sizes = np.diff(np.r_[starts, n])
+    group_end = np.repeat(starts + sizes, sizes)
+    later = group_end - np.arange(n) - 1  # members after this one in its group
+    first = np.repeat(np.arange(n), later)
+    second = first + 1 + np.arange(len(first)) - np.repeat(np.cumsum(later) - later, later)
+    return order[first].astype(np.int64) * n + order[second]
+
+class WorkbookSignatures:
+    """MinHash signatures of each workbook's normalized SKU set.
+
+    Pass one to analyze(signatures=...) and it is filled as workbooks are
+    scanned (from the parse cache when a workbook's signature is stored
+    there). similar_pairs() then finds highly overlapping workbooks with LSH
+    banding in roughly linear time, instead of comparing every pair.
+    Signatures use multiply-shift hashes of pandas' stable 64-bit SKU hashes,
+    so they are comparable across runs with the same ``num_perm`` and ``seed``.
+    """
+
+    def __init__(self, num_perm: int = NUM_PERM, seed: int = 1):
+        self.num_perm = num_perm
+        self.seed = seed
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(0, 2 ** 63, num_perm, dtype=np.uint64) * np.uint64(2) + np.uint64(1)  # odd
+        self._b = rng.integers(0, 2 ** 63, num_perm, dtype=np.uint64)
+        self._signatures: Dict[str, np.ndarray] = {}
+
+    @property
+    def params(self) -> str:
+        """Identifies the hash family; stored signatures are only reused for equal params."""
+        return f"mh{self.num_perm}s{self.seed}"
+
+    def __len__(self):
+        return len(self._signatures)
+
+    def names(self) -> List[str]:
+        return list(self._signatures)
+
+    def signature(self, sku_chunks: Iterable[np.ndarray]) -> np.ndarray:
+        """uint32 MinHash signature of the union of ``sku_chunks`` (all _EMPTY for no SKUs)."""
+        sig = np.full(self.num_perm, _EMPTY, dtype=np.uint32)
+        for skus in sku_chunks:
+            hashes = pd.util.hash_array(np.asarray(skus, dtype=object))
+            for start in range(0, len(hashes), _HASH_CHUNK):
+                x = hashes[start:start + _HASH_CHUNK, None]
+                permuted = ((x * self._a + self._b) >> np.uint64(32)).astype(np.uint32)  # wraps mod 2**64
+                np.minimum(sig, permuted.min(axis=0), out=sig)
+        return sig
+
+    def add(self, name: str, signature: np.ndarray):
+        """Record ``name``'s signature; a name seen twice (same file name in two folders) gets their union."""
+        if (signature == _EMPTY).all():
+            return  # no SKUs, nothing to compare
+        prev = self._signatures.get(name)
+        self._signatures[name] = signature if prev is None else np.minimum(prev, signature)
+
+    def add_scans(self, name: str, scans) -> np.ndarray:
+        """Sign a workbook from its core.SheetScan list (as analyze() and PartialResult hold them) and add it.
+
+        Returns the signature, e.g. for storing it with ParseCache.store_signature().
+        """
+        signature = self.signature(skus for scan in scans for _, _, skus in scan.occurrences)
+        self.add(name, signature)
+        return signature
+
+    def estimate(self, name_a: str, name_b: str) -> float:
+        """Estimated Jaccard similarity of two workbooks' SKU sets."""
+        return float((self._signatures[name_a] == self._signatures[name_b]).mean())
+
+    def similar_pairs(self, threshold: float = 0.5, bands: int | None = None) -> pd.DataFrame:
+        """File_A/File_B/Estimated_Jaccard for workbook pairs estimated at or above ``threshold``.
+
+        Each signature is cut into ``bands`` bands (default: chosen so the LSH
+        S-curve is centred on ``threshold``); workbooks that agree on a whole
+        band become candidates, and only candidates are compared. Pairs near
+        the threshold may be missed or included with probability set by the
+        band layout. Sorted by the estimate, highest first.
+        """
+        columns = ["File_A", "File_B", "Estimated_Jaccard"]
+        names = sorted(self._signatures)  # File_A < File_B, as on Workbook_Overlap
+        if len(names) < 2:
+            return pd.DataFrame(columns=columns)
+        if bands is None:
+            bands, rows = _lsh_params(self.num_perm, threshold)
+        else:
+            rows = self.num_perm // bands
+        sigs = np.stack([self._signatures[n] for n in names])
+        keys = []
+        for band in range(bands):
+            block = np.ascontiguousarray(sigs[:, band * rows:(band + 1) * rows])
+            _, groups = np.unique(block.view(np.dtype((np.void, block.dtype.itemsize * rows))).ravel(),
+                                  return_inverse=True)
+            keys.append(_group_pairs(groups.ravel()))
+        keys = np.unique(np.concatenate(keys))
+        a, b = keys // len(names), keys % len(names)
+        estimates = np.empty(len(keys))
+        for start in range(0, len(keys), 1 << 16):
+            sl = slice(start, start + (1 << 16))
+            estimates[sl] = (sigs[a[sl]] == sigs[b[sl]]).mean(axis=1)
+        keep = estimates >= threshold
+        labels = np.asarray(names, dtype=object)
+        pairs = pd.DataFrame({"File_A": labels[a[keep]], "File_B": labels[b[keep]],
+                              "Estimated_Jaccard": estimates[keep]})
+        return pairs.sort_values("Estimated_Jaccard", ascending=False, kind="stable", ignore_index=True)
@@ -0,0 +1,103 @@
+from __future__ import annotations
+from typing import Dict, Iterable, List, Tuple
+
+from .cache import ParseCache, _occurrence_count, _sheet_headers, decode_payload, encode_payload, settings_fingerprint
+from .core import (NULL_PROFILER, OccurrenceTable, SheetScan, _collect_scans, _finish_analysis,
+                   _iter_workbook_scans, _sheet_filter, _close_cache)
+
+PARTIAL_FORMAT = 1
+_MAGIC = b"SKUDUPE-PARTIAL\x00"
+
+class PartialResult:
+    """Per-workbook scan results for a subset of the input files.
+
+    Produced by ``scan`` on each batch node and combined with merge(), which
+    concatenates workbooks in order (the first copy of a path wins) and unions
+    read errors, so (a + b) + c == a + (b + c) and partials can be merged in a
+    tree. analyze() turns the combined result into analyze()'s 5-tuple.
+    """
+
+    def __init__(self, settings: str, workbooks: List[Tuple[str, List[SheetScan]]] | None = None,
+                 read_errors: Dict[str, str] | None = None):
+        self.settings = settings
+        self.workbooks = list(workbooks or [])
+        self.read_errors = dict(read_errors or {})
+
+    @classmethod
+    def scan(cls, files: List[str], sku_cols: List[str] | None = None, patterns: Iterable[str] | None = None,
+             jobs: int = 1, engine: str = "pandas", cache_dir: str | None = None, cache_max_bytes: int = 1 << 30,
+             sheet_include: Iterable[str] | None = None, sheet_exclude: Iterable[str] | None = None,
+             profiler=NULL_PROFILER, pipeline: bool = False) -> "PartialResult":
+        """Run the per-file part of analyze() over ``files``."""
+        sheets = _sheet_filter(sheet_include, sheet_exclude)
+        cache = None
+        if cache_dir:
+            cache = ParseCache(cache_dir, sku_cols=sku_cols, patterns=patterns, max_bytes=cache_max_bytes,
+                               sheets=sheets, engine=engine)
+        result = cls(settings_fingerprint(sku_cols, patterns, sheets))
+        for fp, scans, error in _iter_workbook_scans(files, sku_cols, patterns, jobs=jobs, engine=engine,
+                                                     cache=cache, profiler=profiler, sheets=sheets,
+                                                     pipeline=pipeline):
+            if error:
+                result.read_errors[fp] = error
+            else:
+                result.workbooks.append((fp, scans))
+        if cache is not None:
+            _close_cache(cache, profiler)
+        return result
+
+    def merge(self, other: "PartialResult") -> "PartialResult":
+        """Combined result of ``self`` followed by ``other``; neither is modified."""
+        if other.settings != self.settings:
+            raise ValueError("partials were scanned with different SKU column settings or sheet filters")
+        seen = set(fp for fp, _ in self.workbooks) | set(self.read_errors)
+        workbooks = self.workbooks + [(fp, scans) for fp, scans in other.workbooks if fp not in seen]
+        read_errors = dict(self.read_errors)
+        for fp, error in other.read_errors.items():
+            if fp not in seen:
+                read_errors.setdefault(fp, error)
+        return PartialResult(self.settings, workbooks, read_errors)
+
+    def analyze(self, sparse: bool = False, profiler=NULL_PROFILER):
+        """analyze()'s (details_df, presence_counts, presence_bool, read_errors, sku_col_map)."""
+        table = OccurrenceTable()
+        sku_col_map: Dict[Tuple[str, str], List[str]] = {}
+        read_errors = dict(self.read_errors)
+        _collect_scans(((fp, scans, None) for fp, scans in self.workbooks), table, sku_col_map, read_errors)
+        return _finish_analysis(table, read_errors, sku_col_map, sparse, profiler)
+
+    def to_bytes(self) -> bytes:
+        header = {
+            "format": PARTIAL_FORMAT,
+            "settings": self.settings,
+            "workbooks": [{"path": fp, "sheets": _sheet_headers(scans)} for fp, scans in self.workbooks],
+            "read_errors": self.read_errors,
+        }
+        return encode_payload(_MAGIC, header, (scan for _, scans in self.workbooks for scan in scans))
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "PartialResult":
+        header, arrays = decode_payload(
+            _MAGIC, data, lambda h: sum(_occurrence_count(wb["sheets"]) for wb in h["workbooks"]))
+        if header.get("format") != PARTIAL_FORMAT:
+            raise ValueError(f"unsupported partial format {header.get('format')!r}")
+        workbooks = [(wb["path"], arrays.take(wb["sheets"])) for wb in header["workbooks"]]
+        return cls(header["settings"], workbooks, header["read_errors"])
+
+    def save(self, path: str):
+        with open(path, "wb") as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path: str) -> "PartialResult":
+        with open(path, "rb") as f:
+            return cls.from_bytes(f.read())
+
+def merge_partials(partials: Iterable[PartialResult]) -> PartialResult:
+    """Left fold of PartialResult.merge over ``partials``."""
+    merged = None
+    for partial in partials:
+        merged = partial if merged is None else merged.merge(partial)
+    if merged is None:
+        raise ValueError("no partial results to merge")
+    return merged
@@ -0,0 +1,170 @@
+from __future__ import annotations
+from typing import Iterable
+import numpy as np
+import pandas as pd
+
+# File pairs generated per step of workbook_overlap(), and the file count up to which
+# pair counts are summed in a dense File x File array instead of a sorted key list.
+_OVERLAP_CHUNK_PAIRS = 1 << 22
+_DENSE_OVERLAP_FILES = 2048
+
+class PresenceMatrix:
+    """Sparse SKU x File occurrence counts in CSR layout.
+
+    Rows are SKUs and columns are workbooks, both sorted like the labels
+    pd.crosstab would produce; only non-zero cells are stored. ``indptr[i]:indptr[i+1]``
+    slices ``indices`` (file positions) and ``counts`` for SKU ``skus[i]``.
+    """
+
+    def __init__(self, skus: pd.Index, files: pd.Index, indptr: np.ndarray, indices: np.ndarray,
+                 counts: np.ndarray):
+        self.skus = skus
+        self.files = files
+        self.indptr = indptr
+        self.indices = indices
+        self.counts = counts
+
+    @classmethod
+    def from_codes(cls, sku_codes: np.ndarray, file_codes: np.ndarray,
+                   skus: Iterable[str], files: Iterable[str]) -> "PresenceMatrix":
+        """Aggregate (sku code, file code) occurrence pairs; codes index the sorted labels."""
+        skus = pd.Index(np.asarray(list(skus), dtype=object), name="SKU")
+        files = pd.Index(np.asarray(list(files), dtype=object), name="File")
+        n_files = max(len(files), 1)
+        keys, counts = np.unique(np.asarray(sku_codes, dtype=np.int64) * n_files
+                                 + np.asarray(file_codes, dtype=np.int64), return_counts=True)
+        rows = keys // n_files
+        indptr = np.zeros(len(skus) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=len(skus)), out=indptr[1:])
+        return cls(skus, files, indptr, (keys % n_files).astype(np.int32), counts.astype(np.int64))
+
+    @classmethod
+    def from_details(cls, details_df: pd.DataFrame) -> "PresenceMatrix":
+        """Build from a details frame with categorical SKU and File columns."""
+        sku = details_df["SKU"].cat
+        file = details_df["File"].cat
+        return cls.from_codes(sku.codes.to_numpy(), file.codes.to_numpy(), sku.categories, file.categories)
+
+    @property
+    def shape(self):
+        return len(self.skus), len(self.files)
+
+    @property
+    def nnz(self) -> int:
+        return len(self.indices)
+
+    @property
+    def workbooks_count(self) -> pd.Series:
+        """Number of workbooks each SKU appears in (non-zero cells per row)."""
+        return pd.Series(np.diff(self.indptr), index=self.skus, name="WorkbooksCount")
+
+    def repeated_within_files(self, min_count: int = 2) -> pd.DataFrame:
+        """SKU/File/Occurrences for every cell counted at least ``min_count`` times, sorted by SKU then File.
+
+        Counts cover all sheets and columns of a workbook, so these are the
+        within-workbook duplicates; found with one pass over the stored cells.
+        """
+        mask = self.counts >= min_count
+        rows = np.repeat(np.arange(len(self.skus)), np.diff(self.indptr))[mask]
+        return pd.DataFrame({
+            "SKU": np.asarray(self.skus, dtype=object)[rows],
+            "File": np.asarray(self.files, dtype=object)[self.indices[mask]],
+            "Occurrences": self.counts[mask],
+        })
+
+    @property
+    def skus_per_file(self) -> np.ndarray:
+        """Number of distinct SKUs in each workbook (non-zero cells per column)."""
+        return np.bincount(self.indices, minlength=len(self.files))
+
+    def _file_pairs(self) -> Iterable[np.ndarray]:
+        """Keys ``a * n_files + b`` (a < b) of the file pairs sharing each SKU, in bounded chunks."""
+        n_files = len(self.files)
+        lengths = np.diff(self.indptr)
+        row_pairs = lengths * (lengths - 1) // 2
+        # split rows so that each chunk yields about _OVERLAP_CHUNK_PAIRS pairs
+        cum = np.cumsum(row_pairs)
+        bounds = np.searchsorted(cum, np.arange(_OVERLAP_CHUNK_PAIRS, cum[-1] if len(cum) else 0,
+                                                _OVERLAP_CHUNK_PAIRS), side="right")
+        row_of = np.repeat(np.arange(len(lengths)), lengths)
+        for r0, r1 in zip(np.r_[0, bounds], np.r_[bounds, len(lengths)]):
+            if r0 >= r1 or not row_pairs[r0:r1].any():
+                continue
+            entries = np.arange(self.indptr[r0], self.indptr[r1])
+            later = self.indptr[row_of[entries] + 1] - entries - 1  # entries after this one in its row
+            first = np.repeat(entries, later)
+            starts = np.cumsum(later) - later
+            second = first + 1 + np.arange(len(first)) - np.repeat(starts, later)
+            # indices are ascending within a row, so first < second gives a < b
+            yield self.indices[first].astype(np.int64) * n_files + self.indices[second]
+
+    def workbook_overlap(self, min_shared: int = 1) -> pd.DataFrame:
+        """Shared SKUs and Jaccard similarity for every pair of workbooks sharing at least ``min_shared`` SKUs.
+
+        This is the upper triangle of B^T B for the SKU x File incidence matrix B,
+        computed row by row: a SKU found in k workbooks adds one to each of its
+        k(k-1)/2 file pairs. Cost follows the number of co-occurrences, not
+        files squared. Sorted by Jaccard, then shared count (descending).
+        """
+        n_files = len(self.files)
+        if n_files <= _DENSE_OVERLAP_FILES:
+            totals = np.zeros(n_files * n_files, dtype=np.int64)
+            for keys in self._file_pairs():
+                totals += np.bincount(keys, minlength=n_files * n_files)
+            keys = np.flatnonzero(totals)
+            shared = totals[keys]
+        else:
+            parts = [np.unique(keys, return_counts=True) for keys in self._file_pairs()]
+            keys = np.concatenate([k for k, _ in parts]) if parts else np.empty(0, dtype=np.int64)
+            counts = np.concatenate([c for _, c in parts]) if parts else np.empty(0, dtype=np.int64)
+            keys, inverse = np.unique(keys, return_inverse=True)
+            shared = np.bincount(inverse, weights=counts, minlength=len(keys)).astype(np.int64)
+        keep = shared >= min_shared
+        keys, shared = keys[keep], shared[keep]
+        a, b = keys // max(n_files, 1), keys % max(n_files, 1)
+        sizes = self.skus_per_file
+        names = np.asarray(self.files, dtype=object)
+        overlap = pd.DataFrame({
+            "File_A": names[a],
+            "File_B": names[b],
+            "Shared_SKUs": shared,
+            "SKUs_A": sizes[a],
+            "SKUs_B": sizes[b],
+            "Jaccard": shared / (sizes[a] + sizes[b] - shared),
+            "Containment": shared / np.minimum(sizes[a], sizes[b]),
+        })
+        return overlap.sort_values(["Jaccard", "Shared_SKUs"], ascending=False, kind="stable", ignore_index=True)
+
+    def to_long_frame(self) -> pd.DataFrame:
+        """One SKU/File/Count row per stored cell; SKU and File are categoricals over the labels."""
+        rows = np.repeat(np.arange(len(self.skus), dtype=np.int32), np.diff(self.indptr))
+        return pd.DataFrame({
+            "SKU": pd.Categorical.from_codes(rows, categories=self.skus),
+            "File": pd.Categorical.from_codes(self.indices, categories=self.files),
+            "Count": self.counts,
+        })
+
+    def _rows(self, skus: Iterable[str] | None) -> np.ndarray:
+        if skus is None:
+            return np.arange(len(self.skus))
+        positions = self.skus.get_indexer(pd.Index(np.asarray(list(skus), dtype=object)))
+        if (positions < 0).any():
+            raise KeyError("SKUs not in the presence matrix")
+        return positions
+
+    def to_counts_frame(self, skus: Iterable[str] | None = None) -> pd.DataFrame:
+        """Dense counts (like pd.crosstab) for the given SKUs only, or for all of them."""
+        rows = self._rows(skus)
+        starts, ends = self.indptr[rows], self.indptr[rows + 1]
+        lengths = ends - starts
+        # gather the CSR slices of the selected rows
+        take = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+        dense = np.zeros((len(rows), len(self.files)), dtype=np.int64)
+        dense[np.repeat(np.arange(len(rows)), lengths), self.indices[take]] = self.counts[take]
+        return pd.DataFrame(dense, index=self.skus[rows], columns=self.files)
+
+    def to_presence_frame(self, skus: Iterable[str] | None = None) -> pd.DataFrame:
+        """Boolean presence for the given SKUs plus a WorkbooksCount column."""
+        presence = self.to_counts_frame(skus) > 0
+        presence["WorkbooksCount"] = presence.sum(axis=1)
+        return presence
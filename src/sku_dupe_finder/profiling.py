@@ -0,0 +1,162 @@
+from __future__ import annotations
+import json
+import os
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Dict, Iterator, List
+
+def _current_rss() -> int | None:
+    """Resident set size in bytes, or None where it can't be read cheaply."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        return None
+
+class Span:
+    """One timed stage: wall/CPU seconds, rows processed, memory deltas and child spans."""
+
+    def __init__(self, name: str, attrs: Dict | None = None):
+        self.name = name
+        self.attrs = attrs or {}
+        self.rows: int | None = None
+        self.wall_s = 0.0
+        self.cpu_s = 0.0
+        self.rss_delta: int | None = None
+        self.alloc_peak: int | None = None  # tracemalloc peak above the span's starting allocation
+        self.children: List["Span"] = []
+        self._carried_peak = 0
+
+    def to_dict(self) -> Dict:
+        d = {"name": self.name, "wall_s": round(self.wall_s, 6), "cpu_s": round(self.cpu_s, 6)}
+        if self.attrs:
+            d["attrs"] = self.attrs
+        if self.rows is not None:
+            d["rows"] = self.rows
+        if self.rss_delta is not None:
+            d["rss_delta_bytes"] = self.rss_delta
+        if self.alloc_peak is not None:
+            d["alloc_peak_bytes"] = self.alloc_peak
+        if self.children:
+            d["children"] = [c.to_dict() for c in self.children]
+        return d
+
+    @classmethod
+    def from_dict(cls, d: Dict) -> "Span":
+        span = cls(d["name"], d.get("attrs"))
+        span.wall_s, span.cpu_s = d["wall_s"], d["cpu_s"]
+        span.rows = d.get("rows")
+        span.rss_delta = d.get("rss_delta_bytes")
+        span.alloc_peak = d.get("alloc_peak_bytes")
+        span.children = [cls.from_dict(c) for c in d.get("children", [])]
+        return span
+
+class Profiler:
+    """Collects nested spans around pipeline stages.
+
+    tracemalloc peaks are recorded only when tracing is already on (e.g.
+    PYTHONTRACEMALLOC=1) or ``trace_memory=True``, since tracing slows parsing
+    down noticeably; RSS deltas are always recorded where available.
+    """
+
+    enabled = True
+
+    def __init__(self, trace_memory: bool = False):
+        self.roots: List[Span] = []
+        self._stack: List[Span] = []
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        self.trace_memory = tracemalloc.is_tracing()
+
+    @contextmanager
+    def span(self, name: str, rows: int | None = None, **attrs) -> Iterator[Span]:
+        """Time the enclosed block as a child of the current span; set ``.rows`` on the yielded span."""
+        span = Span(name, attrs)
+        span.rows = rows
+        parent = self._stack[-1] if self._stack else None
+        (parent.children if parent else self.roots).append(span)
+        self._stack.append(span)
+        if self.trace_memory:
+            start_alloc, outer_peak = tracemalloc.get_traced_memory()
+            if parent is not None:
+                parent._carried_peak = max(parent._carried_peak, outer_peak)
+            tracemalloc.reset_peak()
+        rss0 = _current_rss()
+        cpu0, wall0 = time.process_time(), time.perf_counter()
+        try:
+            yield span
+        finally:
+            span.wall_s = time.perf_counter() - wall0
+            span.cpu_s = time.process_time() - cpu0
+            rss1 = _current_rss()
+            if rss0 is not None and rss1 is not None:
+                span.rss_delta = rss1 - rss0
+            if self.trace_memory:
+                peak = max(tracemalloc.get_traced_memory()[1], span._carried_peak)
+                span.alloc_peak = max(peak - start_alloc, 0)
+                if parent is not None:
+                    parent._carried_peak = max(parent._carried_peak, peak)
+            self._stack.pop()
+
+    def attach(self, spans: List[Dict]):
+        """Add spans recorded elsewhere (a worker process) under the current span."""
+        target = self._stack[-1].children if self._stack else self.roots
+        target.extend(Span.from_dict(d) for d in spans)
+
+    def to_dict(self) -> Dict:
+        return {"spans": [s.to_dict() for s in self.roots]}
+
+    def write_json(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    def format_table(self, max_depth: int | None = None) -> str:
+        """Indented text table of all spans (children under their parent)."""
+        lines = [f"{'stage':<48}{'wall s':>10}{'cpu s':>10}{'rows':>12}{'RSS +MB':>10}{'alloc MB':>10}"]
+
+        def mb(v):
+            return f"{v / 2 ** 20:.1f}" if v is not None else "-"
+
+        def walk(spans: List[Span], depth: int):
+            for s in spans:
+                label = s.name
+                detail = s.attrs.get("file") or s.attrs.get("sheet")
+                if detail:
+                    label = f"{label} {detail}"
+                if "hits" in s.attrs:
+                    label = f"{label} ({s.attrs['hits']} hit, {s.attrs['misses']} miss)"
+                label = ("  " * depth + label)[:47]
+                rows = f"{s.rows:,}" if s.rows is not None else "-"
+                lines.append(f"{label:<48}{s.wall_s:>10.3f}{s.cpu_s:>10.3f}{rows:>12}"
+                             f"{mb(s.rss_delta):>10}{mb(s.alloc_peak):>10}")
+                if max_depth is None or depth + 1 < max_depth:
+                    walk(s.children, depth + 1)
+
+        walk(self.roots, 0)
+        return "\n".join(lines)
+
+class _NullSpan:
+    rows = None
+
+class NullProfiler:
+    """Profiler stand-in that records nothing (the default)."""
+
+    enabled = False
+    trace_memory = False
+    _span = _NullSpan()
+
+    @contextmanager
+    def span(self, name: str, rows: int | None = None, **attrs) -> Iterator[_NullSpan]:
+        yield self._span
+
+    def attach(self, spans: List[Dict]):
+        pass
+
+NULL_PROFILER = NullProfiler()
@@ -0,0 +1,10 @@
+import pytest
+
+def _write_csv(path, skus):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("SKU,Qty\n" + "".join(f"{sku},1\n" for sku in skus))
+
+@pytest.fixture
+def write_csv():
+    """write_csv(path, skus): a CSV workbook with a SKU column holding ``skus`` (and a Qty column)."""
+    return _write_csv
@@ -0,0 +1,72 @@
+import os
+
+import pytest
+import xlsxwriter
+
+from sku_dupe_finder.core import analyze
+from sku_dupe_finder.profiling import Profiler
+
+@pytest.fixture
+def identical_csvs(tmp_path, write_csv):
+    north, south = tmp_path / "north.csv", tmp_path / "south.csv"
+    for path in (north, south):
+        write_csv(path, ["A-100", "A-200", "A-300"])
+    return [str(north), str(south)]
+
+def _sheets_by_file(result):
+    details_df, _, _, _, sku_col_map = result
+    return (sorted(set(zip(details_df["File"].astype(str), details_df["Sheet"].astype(str)))),
+            sorted(sku_col_map))
+
+def test_identical_csvs_keep_their_own_sheet_names_when_cached(tmp_path, identical_csvs):
+    files = identical_csvs
+    cache_dir = str(tmp_path / "cache")
+    uncached = _sheets_by_file(analyze(files))
+    assert uncached[0] == [("north.csv", "north"), ("south.csv", "south")]
+    for _ in range(2):  # cold, then warm cache
+        assert _sheets_by_file(analyze(files, cache_dir=cache_dir)) == uncached
+
+def test_sheet_filter_on_identical_csv_does_not_empty_the_other(tmp_path, identical_csvs):
+    files = identical_csvs
+    cache_dir = str(tmp_path / "cache")
+    for _ in range(2):
+        details_df = analyze(files, cache_dir=cache_dir, sheet_include=["north"])[0]
+        assert set(details_df["File"].astype(str)) == {"north.csv"}
+        assert len(details_df) == 3
+    details_df = analyze(files, cache_dir=cache_dir)[0]
+    assert sorted(details_df.groupby("File", observed=True).size().items()) == [("north.csv", 3), ("south.csv", 3)]
+
+def test_csv_cache_scope_also_applies_in_pipeline_mode(tmp_path, identical_csvs):
+    files = identical_csvs
+    cache_dir = str(tmp_path / "cache")
+    for _ in range(2):
+        result = analyze(files, cache_dir=cache_dir, sheet_include=["north"], pipeline=True)
+        assert _sheets_by_file(result)[0] == [("north.csv", "north")]
+
+def _write_dup_header_workbook(path):
+    wb = xlsxwriter.Workbook(str(path))
+    ws = wb.add_worksheet("Items")
+    ws.write_row(0, 0, ["SKU", "SKU", "SKU.1"])
+    ws.write_row(1, 0, ["A-1", "A-2", "A-3"])
+    wb.close()
+
+def test_engines_do_not_share_cache_entries(tmp_path):
+    path = tmp_path / "dup.xlsx"
+    _write_dup_header_workbook(path)
+    cache_dir = str(tmp_path / "cache")
+    expected = analyze([str(path)], engine="pandas")[4]
+    for engine in ("xml", "openpyxl", "pandas"):
+        assert analyze([str(path)], engine=engine, cache_dir=cache_dir)[4] == expected
+    assert len([n for n in os.listdir(cache_dir) if n.endswith(".skc")]) == 3
+
+def test_cache_hits_and_misses_are_profiled(tmp_path, identical_csvs):
+    files = identical_csvs
+    cache_dir = str(tmp_path / "cache")
+    spans = []
+    for _ in range(2):
+        profiler = Profiler()
+        analyze(files, cache_dir=cache_dir, profiler=profiler)
+        spans.append(next(s for s in profiler.roots[0].children if s.name == "cache_close"))
+    assert spans[0].attrs == {"hits": 0, "misses": 2}
+    assert spans[1].attrs == {"hits": 2, "misses": 0}
+    assert "(2 hit, 0 miss)" in profiler.format_table()
@@ -0,0 +1,17 @@
+from datetime import datetime
+
+import pytest
+
+from sku_dupe_finder.cli import build_parser, main
+
+def test_invalid_modified_date_is_a_usage_error(capsys):
+    with pytest.raises(SystemExit) as exc:
+        main(["--inputs", ".", "--modified-after", "yesterday"])
+    assert exc.value.code == 2
+    assert "--modified-after: invalid ISO date/time 'yesterday'" in capsys.readouterr().err
+
+def test_modified_dates_are_parsed_up_front():
+    args = build_parser().parse_args(["--inputs", ".", "--modified-after", "2024-01-31",
+                                      "--modified-before", "2024-02-01T18:00"])
+    assert args.modified_after == datetime(2024, 1, 31)
+    assert args.modified_before == datetime(2024, 2, 1, 18, 0)
@@ -0,0 +1,18 @@
+from sku_dupe_finder.core import find_excel_files
+from sku_dupe_finder.delta import RunState, analyze_delta
+
+def test_state_lines_up_across_working_directories(tmp_path, monkeypatch, write_csv):
+    folder = tmp_path / "dl"
+    folder.mkdir()
+    write_csv(folder / "a.csv", ["A-1", "A-2"])
+    write_csv(folder / "b.csv", ["A-2", "B-1"])
+    state_path = str(tmp_path / "state.bin")
+
+    _, state = analyze_delta(find_excel_files([str(folder)]))
+    state.save(state_path)
+
+    monkeypatch.chdir(folder)
+    delta, _ = analyze_delta(find_excel_files(["."]), RunState.load(state_path))
+    assert set(delta.workbooks["Status"]) == {"unchanged"}
+    assert len(delta.workbooks) == 2
+    assert delta.newly_duplicated.empty and delta.resolved.empty
@@ -0,0 +1,188 @@
+import datetime
+
+import pandas as pd
+import pytest
+import xlsxwriter
+
+from sku_dupe_finder.core import analyze
+from sku_dupe_finder.profiling import Profiler
+
+ENGINES = ["pandas", "openpyxl", "xml"]
+
+def _write_fixture(path, constant_memory: bool):
+    """A workbook with the cell shapes the engines decode differently.
+
+    constant_memory=True makes xlsxwriter write inline strings instead of shared
+    ones. Rows are written top to bottom, as that mode requires.
+    """
+    wb = xlsxwriter.Workbook(str(path), {"constant_memory": constant_memory})
+    date_fmt = wb.add_format({"num_format": "yyyy-mm-dd"})
+    time_fmt = wb.add_format({"num_format": "[h]:mm:ss"})
+    money_fmt = wb.add_format({"num_format": "#,##0.00", "bold": True})
+    red = wb.add_format({"font_color": "red"})
+
+    ws = wb.add_worksheet("Items")
+    ws.write_row(0, 0, ["SKU", "Item Code", "Qty", "Shipped"])
+    rows = [
+        ["ABC-100", "0042", 3, datetime.date(2024, 1, 31)],
+        [" abc-100 ", 42, 1.5, datetime.datetime(2024, 2, 1, 18, 30)],
+        [123, "123.0", 0, None],
+        [123.0, 1234567890123456, -1, None],
+        ["_x0041_literal", "N/A", None, None],
+        ['"QUOTED"', "'0099'", True, None],
+        ["tab\tand\nnewline", "straße-ß", False, None],
+    ]
+    for r, row in enumerate(rows, start=1):
+        for c, value in enumerate(row):
+            if value is None:
+                continue
+            if isinstance(value, (datetime.date, datetime.datetime)):
+                ws.write_datetime(r, c, value, date_fmt)
+            elif isinstance(value, bool):
+                ws.write_boolean(r, c, value)
+            else:
+                ws.write(r, c, value)
+    r = len(rows) + 1
+    ws.write_rich_string(r, 0, "RICH-", red, "200")
+    ws.write_formula(r, 1, "=1/0", None, "#DIV/0!")
+    ws.write_number(r, 2, 0.25, time_fmt)
+    ws.write_datetime(r + 1, 0, datetime.datetime(2023, 12, 25), date_fmt)  # a date in the SKU column
+    ws.write_number(r + 1, 1, 1234.5, money_fmt)
+    ws.write_formula(r + 2, 0, '="F-"&"300"', None, "F-300")
+    ws.write_formula(r + 2, 1, "=NA()", None, "#N/A")
+    # row and column gaps
+    ws.write_string(r + 6, 0, "AFTER-GAP")
+    ws.write_string(r + 6, 3, "far-right")
+    ws.write_string(r + 9, 1, "0042")
+
+    sparse = wb.add_worksheet("Sparse")
+    sparse.write_row(0, 2, ["Notes", "Part Number"])
+    sparse.write_row(1, 2, ["first", "ABC-100"])
+    sparse.write_row(4, 2, ["gap above", "p-7"])
+    sparse.write_row(5, 3, ["  P-7  "])
+
+    headerless = wb.add_worksheet("No Header")
+    for i, value in enumerate(["X-1000", "X-1001", "X-1002", "ABC-100", "X-1004", "X-1005"]):
+        headerless.write_row(i, 0, [value, i])
+
+    # pandas' default na_values (and a near miss) in a SKU column
+    na = wb.add_worksheet("NA Tokens")
+    na.write_string(0, 0, "SKU")
+    na_tokens = ["#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN",
+                 "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null", "NAN", "NA-1"]
+    for i, token in enumerate(na_tokens, start=1):
+        na.write_string(i, 0, token)
+        na.write_string(i, 1, "x")
+
+    dup = wb.add_worksheet("Dup Headers")
+    dup.write_row(0, 0, ["SKU", "SKU", "SKU.1", "Notes"])
+    dup.write_row(1, 0, ["D-1", "D-2", "D-3", "widget"])
+    dup.write_row(2, 0, ["D-4", "ABC-100", "D-1", "gadget"])
+
+    # blanks that become "Unnamed: i", real "Unnamed: ..." names, and repeats that only collide after strip
+    collide = wb.add_worksheet("Header Collisions")
+    collide.write_row(0, 0, ["Part Number", "", "Unnamed: 1", "Part Number.1", "Part Number", " Part Number",
+                             "part number", "Unnamed: 1", ""])
+    collide.write_row(1, 0, ["C-1", "blank", "u", "C-2", "C-3", "C-4", "C-5", "u2", "blank2"])
+    collide.write_row(2, 0, ["C-6", None, None, "C-1", None, "C-7", None, None, None])
+
+    # no SKU-like header: column 0 is kept only if it looks like SKUs
+    long_skus = wb.add_worksheet("Fallback Long")
+    long_skus.write_row(0, 0, ["Ref", "Qty"])
+    for i in range(1, 700):
+        long_skus.write_row(i, 0, [f"L-{i}" if i < 60 else "---", i])
+    not_skus = wb.add_worksheet("Fallback Rejected")
+    not_skus.write_row(0, 0, ["Comment", "Qty"])
+    for i in range(1, 700):
+        not_skus.write_row(i, 0, ["---" if i < 60 else f"R-{i}", i])
+    sparse_skus = wb.add_worksheet("Fallback Sparse")  # fewer than 50 values in the first sample
+    sparse_skus.write_row(0, 0, ["Ref", "Qty"])
+    for i in range(1, 900):
+        sparse_skus.write_row(i, 0, [f"S-{i}" if i % 20 == 0 else None, i])
+
+    wb.add_worksheet("Empty")
+    wb.close()
+
+@pytest.fixture
+def fixture_files(tmp_path):
+    files = []
+    for name, constant_memory in [("shared_strings.xlsx", False), ("inline_strings.xlsx", True)]:
+        _write_fixture(tmp_path / name, constant_memory)
+        files.append(str(tmp_path / name))
+    return files
+
+def _normalized(result):
+    details_df, _, _, read_errors, sku_col_map = result
+    details = details_df.astype({c: object for c in ["SKU", "File", "Sheet", "Column"]})
+    details = details.sort_values(["File", "Sheet", "Column", "RowNumber"], ignore_index=True)
+    return details, sku_col_map, read_errors
+
+@pytest.mark.parametrize("engine", ["openpyxl", "xml"])
+def test_engines_agree_with_pandas(fixture_files, engine):
+    expected_details, expected_map, expected_errors = _normalized(analyze(fixture_files, engine="pandas"))
+    assert not expected_errors
+    assert len(expected_details) > 20
+    details, sku_col_map, read_errors = _normalized(analyze(fixture_files, engine=engine))
+    assert not read_errors
+    pd.testing.assert_frame_equal(details, expected_details, check_dtype=False)
+    assert sku_col_map == expected_map
+
+def test_colliding_headers_match_across_engines(fixture_files):
+    results = {engine: _normalized(analyze(fixture_files, engine=engine)) for engine in ENGINES}
+    for sheet in ["Dup Headers", "Header Collisions"]:
+        for file in ["shared_strings.xlsx", "inline_strings.xlsx"]:
+            maps = {engine: result[1][(file, sheet)] for engine, result in results.items()}
+            assert maps["openpyxl"] == maps["pandas"] and maps["xml"] == maps["pandas"], maps
+            rows = {engine: result[0][(result[0]["File"] == file) & (result[0]["Sheet"] == sheet)]
+                    .reset_index(drop=True) for engine, result in results.items()}
+            assert not rows["pandas"].empty
+            for engine in ["openpyxl", "xml"]:
+                pd.testing.assert_frame_equal(rows[engine], rows["pandas"], check_dtype=False)
+    assert results["pandas"][1][("shared_strings.xlsx", "Header Collisions")] == [
+        "Part Number", "Part Number.1", "Part Number.2"]
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_first_column_fallback(fixture_files, engine):
+    details, sku_col_map, _ = _normalized(analyze(fixture_files, engine=engine))
+    shared = details[details["File"] == "shared_strings.xlsx"]
+    assert sku_col_map[("shared_strings.xlsx", "Fallback Long")] == ["Ref"]
+    assert len(shared[shared["Sheet"] == "Fallback Long"]) == 699  # decided by the first 50, then kept whole
+    assert ("shared_strings.xlsx", "Fallback Rejected") not in sku_col_map
+    assert len(shared[shared["Sheet"] == "Fallback Sparse"]) == 44
+
+def test_rejected_fallback_reads_only_a_sample(fixture_files):
+    profiler = Profiler()
+    analyze(fixture_files[:1], engine="pandas", profiler=profiler)
+    sheet = next(s for s in _walk(profiler.roots) if s.name == "sheet" and s.attrs["sheet"] == "Fallback Rejected")
+    assert [child.name for child in sheet.children] == ["read_header", "find_sku_columns", "read_sample"]
+
+def _walk(spans):
+    for span in spans:
+        yield span
+        yield from _walk(span.children)
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_pandas_na_strings_are_blank(fixture_files, engine):
+    details = _normalized(analyze(fixture_files, engine=engine))[0]
+    na = details[(details["File"] == "shared_strings.xlsx") & (details["Sheet"] == "NA Tokens")]
+    assert sorted(na["SKU"]) == ["NA-1", "NAN"]
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_repeated_headers_are_renamed_like_read_excel(fixture_files, engine):
+    details, sku_col_map, _ = _normalized(analyze(fixture_files, engine=engine))
+    assert sku_col_map[("shared_strings.xlsx", "Dup Headers")] == ["SKU", "SKU.2", "SKU.1"]
+    dup = details[(details["File"] == "shared_strings.xlsx") & (details["Sheet"] == "Dup Headers")]
+    assert sorted(zip(dup["Column"], dup["SKU"])) == [("SKU", "D-1"), ("SKU", "D-4"), ("SKU.1", "D-1"),
+                                                      ("SKU.1", "D-3"), ("SKU.2", "ABC-100"), ("SKU.2", "D-2")]
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_inline_and_shared_strings_read_the_same(fixture_files, engine):
+    details, sku_col_map, _ = _normalized(analyze(fixture_files, engine=engine, include_within_workbook_dupes=True))
+    # openpyxl leaves _xHHHH_ escapes in inline strings as written (the xml engine follows it),
+    # so that cell is only compared across engines above
+    details = details[~details["SKU"].str.startswith("_X")]
+    by_file = {name: group.drop(columns="File").reset_index(drop=True)
+               for name, group in details.groupby("File", sort=True)}
+    pd.testing.assert_frame_equal(by_file["inline_strings.xlsx"], by_file["shared_strings.xlsx"], check_dtype=False)
+    assert ({k[1]: v for k, v in sku_col_map.items() if k[0] == "inline_strings.xlsx"}
+            == {k[1]: v for k, v in sku_col_map.items() if k[0] == "shared_strings.xlsx"})
@@ -0,0 +1,40 @@
+import os
+
+import pandas as pd
+
+from sku_dupe_finder.cli import main
+from sku_dupe_finder.core import analyze
+from sku_dupe_finder.minhash import WorkbookSignatures
+from sku_dupe_finder.partial import PartialResult
+
+def _catalogs(tmp_path, write_csv):
+    base = [f"SKU-{i}" for i in range(400)]
+    files = []
+    for name, skus in [("a.csv", base), ("b.csv", base[:380]), ("c.csv", base[200:]),
+                       ("d.csv", [f"OTHER-{i}" for i in range(300)])]:
+        write_csv(tmp_path / name, skus)
+        files.append(str(tmp_path / name))
+    return files
+
+def test_add_scans_matches_analyze(tmp_path, write_csv):
+    files = _catalogs(tmp_path, write_csv)
+    from_analyze = WorkbookSignatures()
+    analyze(files, signatures=from_analyze)
+    from_scans = WorkbookSignatures()
+    for fp, scans in PartialResult.scan(files).workbooks:
+        from_scans.add_scans(os.path.basename(fp), scans)
+    assert from_scans.names() == from_analyze.names()
+    expected = from_analyze.similar_pairs(0.3)
+    pd.testing.assert_frame_equal(from_scans.similar_pairs(0.3), expected)
+    # exact Jaccard: a/b 0.95, a/c 0.5, b/c 0.45, d shares nothing
+    assert set(zip(expected["File_A"], expected["File_B"])) == {("a.csv", "b.csv"), ("a.csv", "c.csv"),
+                                                                 ("b.csv", "c.csv")}
+
+def test_merge_writes_similar_workbooks(tmp_path, write_csv):
+    files = _catalogs(tmp_path, write_csv)
+    partial = str(tmp_path / "part.bin")
+    out = str(tmp_path / "merged.xlsx")
+    assert main(["scan", "--inputs", *files, "--out", partial]) == 0
+    assert main(["merge", partial, "--out", out, "--similar-workbooks", "0.8"]) == 0
+    similar = pd.read_excel(out, sheet_name="Similar_Workbooks")
+    assert list(zip(similar["File_A"], similar["File_B"])) == [("a.csv", "b.csv")]
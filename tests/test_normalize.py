@@ -0,0 +1,78 @@
+import datetime
+import random
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from sku_dupe_finder.core import normalize_sku, normalize_sku_series
+
+EDGE_CASES = [
+    # already-clean text SKUs
+    "ABC-123", "abc-123", "SKU 42", "a b  c", "X_9/Z", "~!#$%&()*+,-./:;<=>?@[]^_`{|}",
+    # quotes, inner and outer
+    '"ABC"', "'abc'", "\"'x'\"", 'AB"C', "A'B", '"', "''", '" 123 "', "'0042'",
+    # numeric-looking text
+    "123", "0123", "000", "0", "123.0", "123.", ".0", ".00", "0.0", "123.00", "123.5", "1.50", "-5", "+5",
+    "1e5", "1E5", "12.3.4", "..", ".", "123,456", "١٢٣", "１２３", "²", "123٫0",
+    # 15 digits and more (float() stops being exact)
+    "123456789012345", "1234567890123456", "12345678901234567890", "999999999999999.0",
+    "9999999999999999.0", "0000000000000001", "123456789012345.5",
+    # whitespace variants
+    " ABC ", "\tABC\t", "AB\tC", "A\nB", "\r\nX\r\n", "A B", "　abc", " 123 ", "\t0123\n",
+    # null tokens in every shape
+    "", " ", "N/A", "n/a", "NA", "na", "None", "NONE", "null", "NULL", "-", " - ", '"N/A"', "'null'",
+    # non-ASCII text
+    "ß-1", "straße", "café", "İ", "ﬁ", "Ǆ", "😀",
+    # non-str cells
+    123, 0, -7, 123.0, 123.5, 1e20, float("nan"), None, pd.NA, pd.NaT, np.nan, np.int64(42),
+    np.float64(42.0), True, False, datetime.date(2024, 1, 31), datetime.datetime(2024, 1, 31, 12, 30),
+    pd.Timestamp("2024-01-31"), b"ABC",
+]
+
+_ALPHABET = "AbZ09 .-_'\"\t\n/# ١é"
+
+def _random_values(rng: random.Random, n: int) -> list:
+    values = []
+    for _ in range(n):
+        kind = rng.random()
+        if kind < 0.5:
+            values.append("".join(rng.choice(_ALPHABET) for _ in range(rng.randint(0, 8))))
+        elif kind < 0.75:
+            digits = "".join(rng.choice("0123456789") for _ in range(rng.randint(1, 20)))
+            values.append(rng.choice(["", " ", "'", '"']) + digits
+                          + rng.choice(["", ".", ".0", ".00", ".5", " "]) + rng.choice(["", " ", "'", '"']))
+        elif kind < 0.85:
+            values.append(rng.choice(EDGE_CASES))
+        elif kind < 0.95:
+            values.append(rng.choice([rng.randint(-10 ** 6, 10 ** 17), rng.random() * 10 ** rng.randint(0, 18),
+                                      float(rng.randint(0, 10 ** 6))]))
+        else:
+            values.append(rng.choice([None, float("nan"), pd.NA]))
+    return values
+
+def _assert_matches_scalar(values: list):
+    series = pd.Series(values, dtype=object)
+    got = normalize_sku_series(series)
+    assert got.index.equals(series.index)
+    expected = [normalize_sku(v) for v in values]
+    mismatches = [(v, g, e) for v, g, e in zip(values, got.tolist(), expected) if g != e]
+    assert not mismatches, mismatches[:10]
+
+def test_edge_cases_match_scalar():
+    _assert_matches_scalar(EDGE_CASES)
+
+@pytest.mark.parametrize("seed", range(4))
+def test_random_values_match_scalar(seed):
+    _assert_matches_scalar(_random_values(random.Random(seed), 5000))
+
+def test_all_string_column_matches_scalar():
+    # all-str input takes the infer_dtype fast path
+    values = [v for v in _random_values(random.Random(99), 5000) if isinstance(v, str)]
+    _assert_matches_scalar(values)
+
+def test_string_dtype_and_index_are_kept():
+    series = pd.Series([" abc ", None, "0123", "N/A"], index=[10, 20, 30, 40], dtype="string")
+    got = normalize_sku_series(series)
+    assert got.index.tolist() == [10, 20, 30, 40]
+    assert got.tolist() == ["ABC", None, "123", None]